@@ -0,0 +1,52 @@
+"""Compare the greedy division with the flow-seeded heuristic division.
+
+The greedy division runs on the incremental engine, which makes the same
+assignments as the greedy loop of WorkshopDivision. Both divisions leave
+the fallback for the remaining participants out."""
+import logging
+import time
+
+from instance import createInstance
+from incrementaldivision import IncrementalDivision
+from flowdivision import FlowDivision
+
+
+def greedy(workshops, participants):
+    IncrementalDivision(workshops, participants).run()
+
+
+def flow(workshops, participants):
+    FlowDivision(workshops, participants).run()
+    IncrementalDivision(workshops, participants).run()
+
+
+def evaluate(participants):
+    """Get the total points and the number of free days"""
+    points = 0.0
+    free = 0
+    for p in participants:
+        for w in p.workshops.values():
+            if w is None:
+                free += 1
+            else:
+                points += p.getPoints(w)
+    return points, free
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    print("%-12s %8s %8s %12s %6s" % ("participants", "engine", "seconds",
+                                      "points", "free"))
+    for num_participants in [500, 1000, 2000]:
+        for name, division in [("greedy", greedy), ("flow", flow)]:
+            workshops, participants = createInstance(num_participants)
+            start = time.time()
+            division(workshops, participants)
+            seconds = time.time() - start
+            points, free = evaluate(participants)
+            print("%-12d %8s %8.2f %12.1f %6d" % (num_participants, name,
+                                                  seconds, points, free))
+
+
+if __name__ == '__main__':
+    main()
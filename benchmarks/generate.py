@@ -0,0 +1,95 @@
+"""Generate synthetic Workshops.csv and Anmeldung.csv files.
+
+The files have the columns that WorkshopDivision.loadWorkshops and
+loadParticipants read and are written in the excel dialect."""
+import argparse
+import csv
+import os
+import random
+
+DATES = ["Sa", "Mi"]
+
+
+def getWeights(num_workshops, skew):
+    """Popularity of the workshops, skew 0 rates all workshops alike"""
+    return [1.0 / (rank + 1) ** skew for rank in range(num_workshops)]
+
+
+def sampleWorkshops(rng, weights, k):
+    """Sample k different workshops with the given weights"""
+    # exponential keys give a weighted sample without replacement
+    keys = [(rng.random() ** (1.0 / w), i) for i, w in enumerate(weights)]
+    keys.sort(reverse=True)
+    return [i for key, i in keys[:k]]
+
+
+def writeInstance(directory, participants=2000, workshops=40, days=DATES,
+                  gusp_share=0.5, skew=1.0, ratings=5, capacity_factor=1.1,
+                  seed=0):
+    """Write a random camp into the directory.
+
+    gusp_share is the share of GuSp participants, skew the exponent of the
+    zipf distribution of the workshop popularity and ratings the number of
+    workshops a participant gives points to. The slots of all workshops
+    are capacity_factor times the workshop days of all participants.
+    Returns the paths of the workshop and the registration file."""
+    rng = random.Random(seed)
+    workshops_csv = os.path.join(directory, "Workshops.csv")
+    participants_csv = os.path.join(directory, "Anmeldung.csv")
+    names = ["Workshop %d" % i for i in range(workshops)]
+
+    # one and two age workshops, on one or on all days
+    ages = [rng.choice(["GuSp, CaEx", "GuSp, CaEx", "GuSp", "CaEx"])
+            for i in range(workshops)]
+    workshop_days = [days if rng.random() < 0.5 else [rng.choice(days)]
+                     for i in range(workshops)]
+    num_slots = sum(len(d) for d in workshop_days)
+    capacity = max(1, int(round(
+        capacity_factor * participants * len(days) / float(num_slots))))
+
+    with open(workshops_csv, 'wb') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Nr", "Name", "Betreuer", "Stufen", "Max", "Tage"])
+        for i, name in enumerate(names):
+            writer.writerow([i, name, "Betreuer %d" % i, ages[i], capacity,
+                             ", ".join(workshop_days[i])])
+
+    weights = getWeights(workshops, skew)
+    with open(participants_csv, 'wb') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Nr", "Name", "Stufe", "Trupp GuSp", "Trupp CaEx"] +
+                        names)
+        for i in range(participants):
+            points = [0] * workshops
+            for w in sampleWorkshops(rng, weights, min(ratings, workshops)):
+                points[w] = rng.randint(1, 10)
+            if rng.random() < gusp_share:
+                stufe = "GuSp"
+                trupp = ["Trupp %d" % rng.randint(1, 20), ""]
+            else:
+                stufe = "CaEx"
+                trupp = ["", "Runde %d" % rng.randint(1, 10)]
+            writer.writerow([i, "Teilnehmer %d" % i, stufe] + trupp + points)
+    return workshops_csv, participants_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", nargs="?", default=".")
+    parser.add_argument("-p", "--participants", type=int, default=2000)
+    parser.add_argument("-w", "--workshops", type=int, default=40)
+    parser.add_argument("-d", "--days", nargs="+", default=DATES)
+    parser.add_argument("--gusp-share", type=float, default=0.5)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--ratings", type=int, default=5)
+    parser.add_argument("--capacity-factor", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    files = writeInstance(args.directory, args.participants, args.workshops,
+                          args.days, args.gusp_share, args.skew,
+                          args.ratings, args.capacity_factor, args.seed)
+    print("wrote %s and %s" % files)
+
+
+if __name__ == '__main__':
+    main()
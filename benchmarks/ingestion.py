@@ -0,0 +1,40 @@
+"""Benchmark of loading the workshop and registration csv files.
+
+Writes synthetic files into a temporary directory and times
+loadWorkshops and loadParticipants for growing registration files."""
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from generate import writeInstance  # noqa: E402
+from workshopdivision import WorkshopDivision  # noqa: E402
+
+
+def load(workshops_csv, participants_csv):
+    division = WorkshopDivision(configure_logging=False)
+    start = time.time()
+    division.loadWorkshops(workshops_csv, "excel")
+    division.loadParticipants(participants_csv, "excel")
+    return time.time() - start, len(division.participants)
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    directory = tempfile.mkdtemp()
+    try:
+        print("%-12s %8s" % ("participants", "seconds"))
+        for num_participants in [1000, 10000, 100000]:
+            files = writeInstance(directory, num_participants, 60)
+            seconds, loaded = load(files[0], files[1])
+            print("%-12d %8.2f" % (loaded, seconds))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""Random instances for the benchmarks."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from workshop import Workshop  # noqa: E402
+from participant import Participant  # noqa: E402
+
+DATES = ["Sa", "Mi"]
+AGES = ["GuSp", "CaEx"]
+
+
+def createInstance(num_participants=2000, num_workshops=40, seed=0):
+    """Create random workshops and participants"""
+    rng = random.Random(seed)
+    workshops = []
+    for i in range(num_workshops):
+        ages = rng.choice([AGES, AGES, AGES[:1], AGES[1:]])
+        days = rng.choice([DATES, DATES, DATES[:1], DATES[1:]])
+        capacity = rng.randint(10, 2 * num_participants / num_workshops)
+        workshops.append(Workshop(u"Workshop %d" % i, u"Chef %d" % i,
+                                  ages, days, capacity, i))
+
+    participants = []
+    for i in range(num_participants):
+        points = {w: 0 for w in workshops}
+        for w in rng.sample(workshops, 5):
+            points[w] = rng.randint(1, 10)
+        participants.append(Participant(u"Participant %d" % i,
+                                        rng.choice(AGES), u"Trupp", points,
+                                        DATES))
+    return workshops, participants
+
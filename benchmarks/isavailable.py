@@ -0,0 +1,30 @@
+"""Micro-benchmark of Participant.isAvailable on a full-size instance.
+
+Builds a camp with 2000 participants and 40 workshops in memory, divides
+it and times isAvailable for every (participant, workshop) pair."""
+import logging
+import timeit
+
+from instance import createInstance
+from incrementaldivision import IncrementalDivision
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    workshops, participants = createInstance()
+    IncrementalDivision(workshops, participants).run()
+
+    def checkAll():
+        for p in participants:
+            for w in workshops:
+                p.isAvailable(w)
+
+    repeat = 5
+    best = min(timeit.repeat(checkAll, number=1, repeat=repeat))
+    calls = len(participants) * len(workshops)
+    print("isAvailable: %d calls in %.3fs (%.2f us/call, best of %d)" %
+          (calls, best, best / calls * 1e6, repeat))
+
+
+if __name__ == '__main__':
+    main()
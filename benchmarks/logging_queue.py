@@ -0,0 +1,66 @@
+"""Benchmark of a division run with INFO logging, direct and queued.
+
+Divides a camp of 2000 participants with the workshopdivision logger at
+INFO, writing to a stream and a log file in a temporary directory. The
+direct run writes from the division, the queued run from the listener
+thread of queuedlogging; its time includes the final flush."""
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import queuedlogging  # noqa: E402
+from instance import createInstance  # noqa: E402
+from incrementaldivision import IncrementalDivision  # noqa: E402
+
+
+def configure(directory):
+    logger = logging.getLogger("workshopdivision")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    stream = logging.StreamHandler(open(os.devnull, 'w'))
+    stream.setFormatter(formatter)
+    log_file = logging.FileHandler(os.path.join(directory, "info.log"))
+    log_file.setFormatter(formatter)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    logger.addHandler(stream)
+    logger.addHandler(log_file)
+
+
+def divide():
+    start = time.time()
+    workshops, participants = createInstance()
+    IncrementalDivision(workshops, participants).run()
+    queuedlogging.flushQueuedLogging()
+    return time.time() - start
+
+
+def main(repeat=3):
+    directory = tempfile.mkdtemp()
+    try:
+        configure(directory)
+        direct, queued = [], []
+        # alternate the modes so both get the same warm up
+        for _ in range(repeat):
+            direct.append(divide())
+            queuedlogging.startQueuedLogging()
+            queued.append(divide())
+            queuedlogging.stopQueuedLogging()
+        size = os.path.getsize(os.path.join(directory, "info.log"))
+    finally:
+        shutil.rmtree(directory)
+    print("direct: %.2fs, queued: %.2fs (%.0f%%), %.1f MB logged per run, "
+          "best of %d" % (min(direct), min(queued),
+                          100.0 * min(queued) / min(direct),
+                          size / 2.0 ** 20 / (2 * repeat), repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark of the memory used by the loaded participants.
+
+Writes a synthetic registration file, loads it and reports the growth of
+the peak resident memory and the deep size of the participant objects."""
+import argparse
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from generate import writeInstance  # noqa: E402
+from workshop import Workshop  # noqa: E402
+from workshopdivision import WorkshopDivision  # noqa: E402
+
+
+def getPeakMemory():
+    """Get the peak resident memory of the process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def getDeepSize(obj, seen):
+    """Get the size of the object and everything it references that is not
+    in seen yet. Workshops are not counted."""
+    if id(obj) in seen or isinstance(obj, Workshop):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(getDeepSize(k, seen) + getDeepSize(v, seen)
+                    for k, v in obj.iteritems())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(getDeepSize(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += getDeepSize(vars(obj), seen)
+    for name in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, name):
+            size += getDeepSize(getattr(obj, name), seen)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--participants", type=int, default=20000)
+    parser.add_argument("--workshops", type=int, default=60)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    directory = tempfile.mkdtemp()
+    try:
+        files = writeInstance(directory, args.participants, args.workshops)
+        division = WorkshopDivision(configure_logging=False)
+        division.loadWorkshops(files[0], "excel")
+        before = getPeakMemory()
+        division.loadParticipants(files[1], "excel")
+        after = getPeakMemory()
+    finally:
+        shutil.rmtree(directory)
+
+    seen = set()
+    size = sum(getDeepSize(p, seen) for p in division.participants)
+    count = len(division.participants)
+    print("%d participants x %d workshops" % (count, args.workshops))
+    print("peak memory growth: %.1f MB" % ((after - before) / 1e6))
+    print("participant objects: %.1f MB (%d bytes per participant)" %
+          (size / 1e6, size / max(count, 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Scaling benchmark of a whole division run.
+
+Generates camps of growing size and times loadWorkshops/loadParticipants,
+startDivision and the three exporters. Every size is run --repeat times
+and the best time of every phase is kept. The timings are written to a
+json report. Given the report of an earlier commit with --compare, every
+phase that got slower by more than the threshold and by more than
+--min-delta seconds is reported as a regression and the exit code is 1.
+Phases that took less than --min-seconds in the baseline are too noisy
+and only printed."""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from generate import writeInstance  # noqa: E402
+from workshopdivision import WorkshopDivision  # noqa: E402
+
+PHASES = ["load", "division", "exportDays", "exportWorkshops", "exportTrupps"]
+
+
+def getCommit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def runDivision(directory, files, engine):
+    """Time the phases of one division"""
+    timings = {}
+    division = WorkshopDivision(configure_logging=False)
+    start = time.time()
+    division.loadWorkshops(files[0], "excel")
+    division.loadParticipants(files[1], "excel")
+    timings['load'] = time.time() - start
+
+    start = time.time()
+    division.startDivision(engine)
+    timings['division'] = time.time() - start
+
+    for export in PHASES[2:]:
+        start = time.time()
+        getattr(division, export)(os.path.join(directory, export + ".csv"))
+        timings[export] = time.time() - start
+    return timings
+
+
+def runSize(directory, participants, workshops, engine, seed, repeat=1):
+    """Get the best time of every phase of repeat divisions"""
+    files = writeInstance(directory, participants, workshops, seed=seed)
+    runs = [runDivision(directory, files, engine) for _ in range(repeat)]
+    timings = {'participants': participants, 'workshops': workshops,
+               'repeat': repeat}
+    for phase in PHASES:
+        timings[phase] = min(run[phase] for run in runs)
+    return timings
+
+
+def compare(report, baseline, threshold, min_seconds, min_delta=0.0):
+    """Print the changes against the baseline and return the regressions"""
+    old = {r['participants']: r for r in baseline['results']}
+    regressions = []
+    print("%-12s %-16s %9s %9s %7s" % ("participants", "phase", "baseline",
+                                       "current", "ratio"))
+    for result in report['results']:
+        before = old.get(result['participants'])
+        if before is None:
+            continue
+        for phase in PHASES:
+            ratio = result[phase] / max(before[phase], 1e-6)
+            regressed = ratio > 1.0 + threshold and \
+                before[phase] >= min_seconds and \
+                result[phase] - before[phase] > min_delta
+            print("%-12d %-16s %9.3f %9.3f %6.2fx%s" % (
+                result['participants'], phase, before[phase], result[phase],
+                ratio, " REGRESSION" if regressed else ""))
+            if regressed:
+                regressions.append((result['participants'], phase, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-s", "--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("-w", "--workshops", type=int, default=40)
+    parser.add_argument("-e", "--engine", default="incremental")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("-c", "--compare",
+                        help="report of an earlier run to compare with")
+    parser.add_argument("-t", "--threshold", type=float, default=0.2,
+                        help="allowed slowdown per phase (default 0.2)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="shortest baseline phase to check")
+    parser.add_argument("--min-delta", type=float, default=0.02,
+                        help="smallest slowdown in seconds to report")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="runs per size, the best time counts")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    directory = tempfile.mkdtemp()
+    try:
+        results = []
+        for participants in args.sizes:
+            timings = runSize(directory, participants, args.workshops,
+                              args.engine, args.seed, args.repeat)
+            print(" ".join("%s=%.3fs" % (phase, timings[phase])
+                           for phase in PHASES) +
+                  " (%d participants)" % participants)
+            results.append(timings)
+    finally:
+        shutil.rmtree(directory)
+
+    report = {'commit': getCommit(), 'python': platform.python_version(),
+              'engine': args.engine, 'time': time.time(),
+              'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold, args.min_seconds,
+                   args.min_delta):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
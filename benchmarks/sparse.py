@@ -0,0 +1,58 @@
+"""Benchmark of the statistics with the dense and the sparse preferences.
+
+Builds a camp where every participant gives points to 5 of many
+workshops and times the statistics per workshop and the search for the
+participants with the most points, as one iteration of the greedy
+division does them, with and without the sparse backend."""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from instance import createInstance  # noqa: E402
+from workshopdivision import WorkshopDivision  # noqa: E402
+
+
+def runStatistics(division):
+    """Time the statistics of all participants"""
+    start = time.time()
+    division.getSumPointsPerWorkshop()
+    division.getMaxPointsPerWorkshops()
+    division.getMedianPointsPerWorkshop()
+    division.getMeanPointsPerWorkshop()
+    for w in division.workshops:
+        division.getParticipantWithMaxPoints(w)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-p", "--participants", type=int, default=5000)
+    parser.add_argument("-w", "--workshops", type=int, default=150)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    workshops, participants = createInstance(args.participants,
+                                             args.workshops)
+    division = WorkshopDivision(configure_logging=False)
+    division.workshops = workshops
+    division.participants = participants
+    # warm up the cached availability
+    runStatistics(division)
+    dense = runStatistics(division)
+
+    division.useSparseBackend()
+    start = time.time()
+    division.getSparsePreferences()
+    build = time.time() - start
+    sparse = runStatistics(division)
+    print("%d participants, %d workshops: dense %.3fs, sparse %.3fs "
+          "(%.1fx, built in %.3fs)" % (args.participants, args.workshops,
+                                       dense, sparse, dense / sparse, build))
+
+
+if __name__ == '__main__':
+    main()
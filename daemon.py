@@ -0,0 +1,345 @@
+"""Keep a division in memory and serve it over a local JSON API.
+
+GET    /status                      points and unassigned participants
+GET    /statistics                  live fill, points and demand
+GET    /participants/<name>         the workshops of the participants
+POST   /participants                add {"name", "stufe", "trupp",
+                                    "points": {workshop: points}}
+DELETE /participants/<name>         remove the participants
+POST   /division                    divide from scratch {"engine"}
+POST   /division/refresh            place new participants, keep the rest
+GET    /export/<view>?format=csv    stream a view of the exporter
+"""
+import argparse
+import json
+import logging
+import math
+import numbers
+import os
+import threading
+import urllib
+import urlparse
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn, UnixStreamServer
+from contextlib import contextmanager
+
+import exporter
+import multistart
+from workshopdivision import ENGINES, WorkshopDivision
+
+logger = logging.getLogger("workshopdivision")
+
+CONTENT_TYPES = {'csv': "text/csv", 'jsonl': "application/x-ndjson",
+                 'parquet': "application/octet-stream"}
+
+
+class ReadWriteLock(object):
+    """Many readers or one writer, waiting writers go first"""
+
+    def __init__(self):
+        super(ReadWriteLock, self).__init__()
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writer_active = False
+        self.waiting_writers = 0
+
+    @contextmanager
+    def reading(self):
+        with self.condition:
+            while self.writer_active or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer_active or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer_active = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer_active = False
+                self.condition.notify_all()
+
+
+class DivisionService(object):
+    """The division of the daemon, writes are serialized and reads run
+    concurrently"""
+
+    def __init__(self, division):
+        super(DivisionService, self).__init__()
+        self.division = division
+        self.lock = ReadWriteLock()
+        self.statistics = division.getStatistics()
+
+    def findParticipants(self, name):
+        return [p for p in self.division.participants if p.name == name]
+
+    def describe(self, p):
+        workshops = p.workshops
+        return {'name': p.name, 'stufe': p.age, 'trupp': p.trupp,
+                'workshops': {d: w.name if w is not None else None
+                              for d, w in workshops.iteritems()},
+                'points': sum(p.getPoints(w) for w in workshops.values()
+                              if w is not None)}
+
+    def getStatus(self):
+        with self.lock.reading():
+            score = multistart.scoreDivision(self.division.participants)
+            score['participants'] = len(self.division.participants)
+            return score
+
+    def getStatistics(self):
+        """Read the live statistics, they are updated on every assignment,
+        so this only costs the lookups of the counters.
+
+        The statistics have their own lock, so this does not wait for a
+        running division."""
+        return self.statistics.getSnapshot()
+
+    def getParticipants(self, name):
+        with self.lock.reading():
+            return [self.describe(p) for p in self.findParticipants(name)]
+
+    def parseParticipant(self, data):
+        """Get the name, stufe, trupp and points of a posted participant.
+
+        Raises ValueError, TypeError or KeyError if the data is invalid."""
+        division = self.division
+        name = data['name']
+        stufe = data['stufe']
+        trupp = data.get('trupp', u"")
+        for key, value in [('name', name), ('stufe', stufe),
+                           ('trupp', trupp)]:
+            if not isinstance(value, basestring):
+                raise TypeError("%s must be a string" % key)
+        if not name:
+            raise ValueError("name must not be empty")
+        if stufe not in division.available_ages:
+            raise ValueError("unknown stufe %s" % stufe)
+
+        given = data.get('points', {})
+        if not isinstance(given, dict):
+            raise TypeError("points must be an object")
+        points = [0] * len(division.workshops)
+        for workshop, value in given.iteritems():
+            w = division.getWorkshop(workshop)
+            if w is None:
+                raise KeyError("unknown workshop %s" % workshop)
+            if isinstance(value, bool) or \
+                    not isinstance(value, numbers.Real):
+                raise TypeError("points of %s must be a number" % workshop)
+            if value < 0 or math.isinf(value) or math.isnan(value):
+                raise ValueError("invalid points of %s" % workshop)
+            points[w.id] = value
+        # the points are normalized by their sum
+        if not any(points):
+            raise ValueError("no points")
+        return name, stufe, trupp, points
+
+    def addParticipant(self, data):
+        """Add a participant of the posted data, raises ValueError,
+        TypeError or KeyError if the data is invalid"""
+        with self.lock.writing():
+            name, stufe, trupp, points = self.parseParticipant(data)
+            p = self.division.addParticipant(name, stufe, trupp, points)
+            return self.describe(p)
+
+    def removeParticipants(self, name):
+        with self.lock.writing():
+            participants = self.findParticipants(name)
+            self.division.removeParticipants(participants)
+            return len(participants)
+
+    def divide(self, engine):
+        """Divide from scratch, raises ValueError for an unknown engine
+        before anything is changed"""
+        if not isinstance(engine, basestring) or engine not in ENGINES:
+            raise ValueError("unknown engine %r" % (engine,))
+        with self.lock.writing():
+            for p in self.division.participants:
+                p.clearAssignment()
+            self.division.startDivision(engine)
+        return self.getStatus()
+
+    def refresh(self):
+        with self.lock.writing():
+            self.division.updateDivision()
+        return self.getStatus()
+
+    def getExporter(self):
+        """Get an exporter of the current division, it keeps its rows when
+        the division changes"""
+        with self.lock.reading():
+            return exporter.Exporter(self.division)
+
+
+class DivisionRequestHandler(BaseHTTPRequestHandler):
+
+    def sendJson(self, data, status=200):
+        body = json.dumps(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def sendError(self, status, message):
+        self.sendJson({'error': message}, status)
+
+    def readJson(self):
+        length = int(self.headers.getheader('content-length') or 0)
+        data = json.loads(self.rfile.read(length)) if length else {}
+        if not isinstance(data, dict):
+            raise ValueError("expected a json object")
+        return data
+
+    def getPath(self):
+        url = urlparse.urlparse(self.path)
+        parts = [urllib.unquote(part).decode('utf-8')
+                 for part in url.path.split("/") if part]
+        return parts, urlparse.parse_qs(url.query)
+
+    def do_GET(self):
+        service = self.server.service
+        parts, query = self.getPath()
+        if parts == ["status"]:
+            self.sendJson(service.getStatus())
+        elif parts == ["statistics"]:
+            self.sendJson(service.getStatistics())
+        elif len(parts) == 2 and parts[0] == "participants":
+            participants = service.getParticipants(parts[1])
+            if participants:
+                self.sendJson(participants)
+            else:
+                self.sendError(404, "unknown participant")
+        elif len(parts) == 2 and parts[0] == "export":
+            output_format = query.get('format', ["csv"])[0]
+            views = service.getExporter()
+            if not views.canWrite(parts[1], output_format):
+                self.sendError(400, "can't export %s as %s" %
+                               (parts[1], output_format))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPES[output_format])
+            self.end_headers()
+            views.writeTo(self.wfile, parts[1], output_format)
+        else:
+            self.sendError(404, "unknown path")
+
+    def do_POST(self):
+        service = self.server.service
+        parts, query = self.getPath()
+        try:
+            data = self.readJson()
+        except ValueError:
+            self.sendError(400, "invalid json")
+            return
+        if parts == ["participants"]:
+            if 'name' not in data or 'stufe' not in data:
+                self.sendError(400, "name and stufe are required")
+                return
+            try:
+                participant = service.addParticipant(data)
+            except (ValueError, TypeError, KeyError) as e:
+                # KeyError quotes its message
+                message = e.args[0] if e.args else str(e)
+                self.sendError(400, "invalid participant: %s" % message)
+                return
+            self.sendJson(participant, 201)
+        elif parts == ["division"]:
+            try:
+                status = service.divide(data.get('engine', "incremental"))
+            except ValueError as e:
+                self.sendError(400, str(e))
+                return
+            self.sendJson(status)
+        elif parts == ["division", "refresh"]:
+            self.sendJson(service.refresh())
+        else:
+            self.sendError(404, "unknown path")
+
+    def do_DELETE(self):
+        parts, query = self.getPath()
+        if len(parts) == 2 and parts[0] == "participants":
+            removed = self.server.service.removeParticipants(parts[1])
+            if removed:
+                self.sendJson({'removed': removed})
+            else:
+                self.sendError(404, "unknown participant")
+        else:
+            self.sendError(404, "unknown path")
+
+    def address_string(self):
+        # unix sockets have no client address
+        if isinstance(self.client_address, tuple):
+            return BaseHTTPRequestHandler.address_string(self)
+        return "unix"
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class DivisionServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        HTTPServer.__init__(self, address, DivisionRequestHandler)
+        self.service = service
+
+
+class UnixDivisionServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        if os.path.exists(path):
+            os.remove(path)
+        UnixStreamServer.__init__(self, path, DivisionRequestHandler)
+        self.service = service
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve a workshop division over a local JSON API")
+    parser.add_argument("--workshops", default="Workshops.csv")
+    parser.add_argument("--participants", default="Anmeldung.csv")
+    parser.add_argument("--engine", default="incremental")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="port on localhost")
+    parser.add_argument("--socket", help="serve on this unix socket instead")
+    args = parser.parse_args()
+
+    division = WorkshopDivision()
+    division.loadWorkshops(args.workshops)
+    division.loadParticipants(args.participants)
+    division.startDivision(args.engine)
+    service = DivisionService(division)
+
+    if args.socket:
+        server = UnixDivisionServer(args.socket, service)
+        logger.warning("Serving the division on %s", args.socket)
+    else:
+        server = DivisionServer(("127.0.0.1", args.port), service)
+        logger.warning("Serving the division on http://127.0.0.1:%d",
+                       args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
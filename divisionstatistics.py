@@ -0,0 +1,333 @@
+import logging
+import threading
+
+logger = logging.getLogger("workshopdivision")
+
+# the width of the bins of the points of the participants, they have 100
+# points to give
+BIN_WIDTH = 10
+NUM_BINS = 100 / BIN_WIDTH + 1
+
+
+def getBin(points):
+    return min(max(int(points / BIN_WIDTH), 0), NUM_BINS - 1)
+
+
+class DivisionStatistics(object):
+    """Statistics of a division that follow every assignment.
+
+    The statistics listen to the workshops and update their counters on
+    every assignment and removal, so all reads are O(1). Every participant
+    has the workshops it is assigned to as the statistics saw them and
+    contributes to the demand of the workshops of its age it gave points
+    to, as long as it has a free day the workshop uses and is not assigned
+    to the workshop.
+
+    The participants are also counted by their age and free days, so the
+    participants that are available for a workshop (see
+    Participant.isAvailable) are known from the free days of the workshop.
+
+    Every update and read holds a small lock, so the counters can be read
+    by another thread while a division runs."""
+
+    def __init__(self, workshops, participants):
+        super(DivisionStatistics, self).__init__()
+        self.workshops = workshops
+        self.by_id = {w.id: w for w in workshops}
+        self.places = {w: w.max_participants_per_day * len(w.days)
+                       for w in workshops}
+        self.total_places = sum(self.places.itervalues())
+        self.assigned = {w: 0 for w in workshops}
+        self.day_assigned = {w: {d: 0 for d in w.days} for w in workshops}
+        self.points = {w: 0.0 for w in workshops}
+        # the demand per workshop by the free days of the participants the
+        # workshop uses, each a list of the number and the points
+        self.demand = {w: {} for w in workshops}
+        # the number of participants per age and free days and of the
+        # assigned participants per workshop and free days
+        self.groups = {}
+        self.taken = {w: {} for w in workshops}
+        self.trupps = {}
+        self.histogram = [0] * NUM_BINS
+        self.num_participants = 0
+        self.num_fully_assigned = 0
+        self.num_assignments = 0
+        self.total_points = 0.0
+        # the state of every participant
+        self.entries = {}
+        self.workshops_of = {}
+        self.free_days = {}
+        self.participant_points = {}
+        self.lock = threading.RLock()
+        for p in participants:
+            self.addParticipant(p)
+        for w in workshops:
+            w.addListener(self)
+        logger.debug("Created statistics of %d participants",
+                     self.num_participants)
+
+    def close(self):
+        """Stop following the workshops"""
+        for w in self.workshops:
+            w.removeListener(self)
+
+    def isFullyAssigned(self, p):
+        return len(self.workshops_of[p]) >= len(p.available_dates)
+
+    def getDemanded(self, p):
+        """Get the workshops, the free days they use and the points the
+        participant adds to the demand"""
+        assigned = self.workshops_of[p]
+        free = self.free_days[p]
+        demanded = []
+        for w, value in self.entries[p]:
+            days = w.day_set.intersection(free)
+            if days and w not in assigned:
+                demanded.append((w, days, value))
+        return demanded
+
+    def count(self, p, step):
+        """Add step to the counters of the free days of the participant"""
+        free = frozenset(self.free_days[p])
+        key = (p.age, free)
+        self.groups[key] = self.groups.get(key, 0) + step
+        for w in self.workshops_of[p]:
+            self.taken[w][free] = self.taken[w].get(free, 0) + step
+
+    def enter(self, p):
+        """Add everything that depends on the workshops of the participant"""
+        points = self.participant_points[p]
+        full = self.isFullyAssigned(p)
+        self.histogram[getBin(points)] += 1
+        self.count(p, 1)
+        trupp = self.trupps.setdefault(
+            p.trupp, {'participants': 0, 'fully_assigned': 0, 'points': 0.0})
+        trupp['participants'] += 1
+        trupp['points'] += points
+        if full:
+            self.num_fully_assigned += 1
+            trupp['fully_assigned'] += 1
+        else:
+            for w, days, value in self.getDemanded(p):
+                demand = self.demand[w].setdefault(days, [0, 0.0])
+                demand[0] += 1
+                demand[1] += value
+
+    def leave(self, p):
+        """Remove everything that enter added"""
+        points = self.participant_points[p]
+        full = self.isFullyAssigned(p)
+        self.histogram[getBin(points)] -= 1
+        self.count(p, -1)
+        trupp = self.trupps[p.trupp]
+        trupp['participants'] -= 1
+        trupp['points'] -= points
+        if full:
+            self.num_fully_assigned -= 1
+            trupp['fully_assigned'] -= 1
+        else:
+            for w, days, value in self.getDemanded(p):
+                demand = self.demand[w][days]
+                demand[0] -= 1
+                demand[1] -= value
+
+    def addParticipant(self, p):
+        """Count a participant of the division with its current workshops"""
+        with self.lock:
+            self.countParticipant(p)
+
+    def countParticipant(self, p):
+        if p in self.entries:
+            return
+        self.entries[p] = [(self.by_id[k], v) for k, v in enumerate(p.points)
+                           if v and k in self.by_id and
+                           p.age in self.by_id[k].ages]
+        days = [(d, w) for d, w in zip(p.available_dates, p.assigned)
+                if w in self.places]
+        assigned = [w for d, w in days]
+        self.workshops_of[p] = assigned
+        self.free_days[p] = set(p.available_dates).difference(
+            d for d, w in days)
+        points = 0.0
+        for d, w in days:
+            value = p.getPoints(w)
+            self.assigned[w] += 1
+            self.day_assigned[w][d] += 1
+            self.points[w] += value
+            points += value
+        self.participant_points[p] = points
+        self.num_participants += 1
+        self.num_assignments += len(assigned)
+        self.total_points += points
+        self.enter(p)
+
+    def removeParticipant(self, p):
+        """Forget a participant that left the division"""
+        with self.lock:
+            if p not in self.entries:
+                return
+            self.leave(p)
+            for d, w in zip(p.available_dates, p.assigned):
+                if w in self.workshops_of[p]:
+                    self.day_assigned[w][d] -= 1
+            for w in self.workshops_of[p]:
+                self.assigned[w] -= 1
+                self.points[w] -= p.getPoints(w)
+            self.num_participants -= 1
+            self.num_assignments -= len(self.workshops_of[p])
+            self.total_points -= self.participant_points[p]
+            del self.entries[p]
+            del self.workshops_of[p]
+            del self.free_days[p]
+            del self.participant_points[p]
+
+    def participantAssigned(self, workshop, day, participant):
+        # the participant sets its workshop after this call
+        with self.lock:
+            if participant not in self.entries:
+                self.countParticipant(participant)
+            self.leave(participant)
+            value = participant.getPoints(workshop)
+            self.workshops_of[participant].append(workshop)
+            self.free_days[participant].discard(day)
+            self.assigned[workshop] += 1
+            self.day_assigned[workshop][day] += 1
+            self.points[workshop] += value
+            self.participant_points[participant] += value
+            self.num_assignments += 1
+            self.total_points += value
+            self.enter(participant)
+
+    def participantRemoved(self, workshop, day, participant):
+        with self.lock:
+            if participant not in self.entries:
+                self.countParticipant(participant)
+            if workshop not in self.workshops_of[participant]:
+                return
+            self.leave(participant)
+            value = participant.getPoints(workshop)
+            self.workshops_of[participant].remove(workshop)
+            self.free_days[participant].add(day)
+            self.assigned[workshop] -= 1
+            self.day_assigned[workshop][day] -= 1
+            self.points[workshop] -= value
+            self.participant_points[participant] -= value
+            self.num_assignments -= 1
+            self.total_points -= value
+            self.enter(participant)
+
+    def getFill(self, workshop):
+        """Get the assigned share of the places of the workshop"""
+        places = self.places[workshop]
+        return float(self.assigned[workshop]) / places if places else 0.0
+
+    def getDayFill(self, workshop, day):
+        places = workshop.max_participants_per_day
+        if not places or not workshop.usesDay(day):
+            return 0.0
+        return float(self.day_assigned[workshop][day]) / places
+
+    def getFreeDays(self, workshop):
+        """Get the days of the workshop with free places as counted"""
+        places = workshop.max_participants_per_day
+        return frozenset(d for d, n in self.day_assigned[workshop].iteritems()
+                         if n < places)
+
+    def getMeanPoints(self, workshop):
+        """Get the mean points of the assigned participants of a workshop"""
+        assigned = self.assigned[workshop]
+        return self.points[workshop] / assigned if assigned else 0.0
+
+    def getDemand(self, workshop):
+        """Get the number and the points of the participants of its ages
+        with a free day it uses that gave the workshop points and are not
+        assigned to it"""
+        with self.lock:
+            demand = self.demand[workshop].values()
+            return sum(d[0] for d in demand), sum(d[1] for d in demand)
+
+    def getAvailable(self, workshop):
+        """Get the number and the points of the participants that are
+        available for the workshop, with or without points for it"""
+        with self.lock:
+            free = self.getFreeDays(workshop)
+            num = sum(n for (age, days), n in self.groups.iteritems()
+                      if age in workshop.ages and not free.isdisjoint(days))
+            num -= sum(n for days, n in self.taken[workshop].iteritems()
+                       if not free.isdisjoint(days))
+            points = sum(d[1] for days, d in self.demand[workshop].iteritems()
+                         if not free.isdisjoint(days))
+            return num, points
+
+    def getMeanAvailablePoints(self):
+        """Get the mean points of the available participants per workshop
+        like WorkshopDivision.getMeanPointsPerWorkshop, without the
+        workshops nobody is available for"""
+        with self.lock:
+            mean_points = {}
+            for w in self.workshops:
+                num, points = self.getAvailable(w)
+                if num:
+                    mean_points[w] = points / num
+            return mean_points
+
+    def getTrupp(self, trupp):
+        """Get the participants, the fully assigned participants, their
+        share and the points of a trupp"""
+        with self.lock:
+            data = dict(self.trupps.get(trupp, {'participants': 0,
+                                                'fully_assigned': 0,
+                                                'points': 0.0}))
+        data['coverage'] = float(data['fully_assigned']) / \
+            data['participants'] if data['participants'] else 0.0
+        return data
+
+    def getTrupps(self):
+        """Get getTrupp of every trupp"""
+        with self.lock:
+            return {trupp: self.getTrupp(trupp) for trupp in self.trupps}
+
+    def getHistogram(self):
+        """Get the number of participants per BIN_WIDTH points"""
+        with self.lock:
+            return self.histogram[:]
+
+    def getSummary(self):
+        """Get the totals of the division"""
+        with self.lock:
+            return {
+                'participants': self.num_participants,
+                'fully_assigned': self.num_fully_assigned,
+                'assignments': self.num_assignments,
+                'places': self.total_places,
+                'fill': float(self.num_assignments) / self.total_places
+                if self.total_places else 0.0,
+                'points': self.total_points,
+                'mean_points': self.total_points / self.num_participants
+                if self.num_participants else 0.0,
+                'histogram': self.getHistogram(),
+            }
+
+    def getWorkshopSummary(self, workshop):
+        with self.lock:
+            demand, demand_points = self.getDemand(workshop)
+            return {
+                'assigned': self.assigned[workshop],
+                'places': self.places[workshop],
+                'fill': self.getFill(workshop),
+                'days': {d: self.getDayFill(workshop, d)
+                         for d in workshop.days},
+                'mean_points': self.getMeanPoints(workshop),
+                'demand': demand,
+                'demand_points': demand_points,
+            }
+
+    def getSnapshot(self):
+        """Get getSummary with the getWorkshopSummary of every workshop by
+        name and getTrupps, all of the same moment"""
+        with self.lock:
+            data = self.getSummary()
+            data['workshops'] = {w.name: self.getWorkshopSummary(w)
+                                 for w in self.workshops}
+            data['trupps'] = self.getTrupps()
+            return data
@@ -0,0 +1,173 @@
+import csv
+import json
+import logging
+from operator import itemgetter
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger("workshopdivision")
+
+# the columns of the assignment views in the order of their files
+VIEWS = {
+    'days': ("day", "workshop", "name", "stufe", "trupp", "punkte"),
+    'workshops': ("workshop", "day", "name", "stufe", "trupp", "punkte"),
+    'trupps': ("stufe", "trupp", "name", "day", "workshop", "punkte"),
+    'rosters': ("workshop", "day", "leitung", "anzahl", "max", "namen"),
+}
+EXTENSIONS = {'csv': "csv", 'jsonl': "jsonl", 'parquet': "parquet"}
+# the columns of a materialized assignment row
+COLUMNS = VIEWS['days']
+BUFFER_SIZE = 1024 * 1024
+
+
+def isColumnarSupported():
+    """If pyarrow is installed and parquet files can be written"""
+    return pyarrow is not None
+
+
+class Exporter(object):
+    """Write several views of a division from one pass over it.
+
+    Every assignment is materialized once as a row with the columns of
+    COLUMNS, the views only pick and reorder the rows and columns. The
+    rows are encoded to UTF-8 once for all csv files."""
+
+    def __init__(self, division):
+        super(Exporter, self).__init__()
+        self.dates = division.available_dates
+        self.rows = []
+        self.encoded = None
+        self.rosters = []
+        # the indices of the rows of every day and participant
+        self.by_day = {d: [] for d in self.dates}
+        self.by_participant = {}
+
+        for w in division.workshops:
+            for d in w.days:
+                start = len(self.rows)
+                for p in w.getParticipantsOfDay(d):
+                    self.by_participant.setdefault(p, []).append(
+                        len(self.rows))
+                    self.rows.append((d, w.name, p.name, p.age, p.trupp,
+                                      p.getPoints(w)))
+                self.by_day.setdefault(d, []).extend(
+                    range(start, len(self.rows)))
+                self.rosters.append((w.name, d, w.supervisor,
+                                     len(self.rows) - start,
+                                     w.max_participants_per_day,
+                                     u", ".join(r[2] for r in
+                                                self.rows[start:])))
+
+        order = {d: i for i, d in enumerate(self.dates)}
+        self.by_trupp = []
+        for p in division.participants:
+            indices = self.by_participant.get(p, [])
+            indices.sort(key=lambda i: order.get(self.rows[i][0],
+                                                 len(order)))
+            self.by_trupp.extend(indices)
+
+    def getEncodedRows(self):
+        """Get the rows with the cells encoded for csv"""
+        if self.encoded is None:
+            texts = {}
+
+            def encode(text):
+                encoded = texts.get(text)
+                if encoded is None:
+                    encoded = texts[text] = text.encode('utf-8') \
+                        if isinstance(text, unicode) else str(text)
+                return encoded
+
+            self.encoded = [(encode(d), encode(w), encode(name),
+                             encode(age), encode(trupp), str(points))
+                            for d, w, name, age, trupp, points in self.rows]
+        return self.encoded
+
+    def getRows(self, view, encoded=False):
+        """Get the rows of a view with the columns of VIEWS"""
+        if view == 'rosters':
+            if encoded:
+                return [[c.encode('utf-8') if isinstance(c, unicode)
+                         else str(c) for c in row] for row in self.rosters]
+            return self.rosters
+
+        if view == 'days':
+            indices = [i for d in self.dates for i in self.by_day[d]]
+        elif view == 'workshops':
+            indices = range(len(self.rows))
+        elif view == 'trupps':
+            indices = self.by_trupp
+        else:
+            logger.error("Unknown export view %s", view)
+            return None
+
+        rows = self.getEncodedRows() if encoded else self.rows
+        columns = itemgetter(*[COLUMNS.index(c) for c in VIEWS[view]])
+        return [columns(rows[i]) for i in indices]
+
+    def writeCsv(self, f, header, rows):
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+    def writeJsonLines(self, f, header, rows):
+        # the keys are the same on every line, only the values are encoded
+        line = "{" + ", ".join(json.dumps(key) + ": %s"
+                               for key in header) + "}\n"
+        values = {}
+
+        def encode(value):
+            encoded = values.get(value)
+            if encoded is None:
+                encoded = values[value] = json.dumps(value)
+            return encoded
+
+        f.writelines(line % tuple([encode(v) for v in row]) for row in rows)
+
+    def writeParquet(self, f, header, rows):
+        columns = zip(*rows) if rows else [()] * len(header)
+        table = pyarrow.Table.from_arrays(
+            [pyarrow.array(list(c)) for c in columns], names=list(header))
+        pyarrow.parquet.write_table(table, f)
+
+    def canWrite(self, view, output_format):
+        """If the view and the format are known and can be written"""
+        if view not in VIEWS:
+            logger.error("Unknown export view %s", view)
+            return False
+        if output_format not in EXTENSIONS:
+            logger.error("Unknown export format %s", output_format)
+            return False
+        if output_format == "parquet" and not isColumnarSupported():
+            logger.error("pyarrow is not installed, can't write parquet")
+            return False
+        return True
+
+    def writeTo(self, f, view, output_format="csv"):
+        """Write a view in the format to an open binary file.
+
+        Returns the number of rows or None if the view can't be written."""
+        if not self.canWrite(view, output_format):
+            return None
+        header = VIEWS[view]
+        rows = self.getRows(view, encoded=output_format == "csv")
+        if output_format == "csv":
+            self.writeCsv(f, header, rows)
+        elif output_format == "jsonl":
+            self.writeJsonLines(f, header, rows)
+        else:
+            self.writeParquet(f, header, rows)
+        return len(rows)
+
+    def write(self, filename, view, output_format="csv"):
+        """Write a view in the format, returns if the file was written"""
+        if not self.canWrite(view, output_format):
+            return False
+        with open(filename, 'wb', BUFFER_SIZE) as f:
+            num_rows = self.writeTo(f, view, output_format)
+        logger.info("Exported %d rows to %s", num_rows, filename)
+        return True
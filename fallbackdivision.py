@@ -0,0 +1,80 @@
+import heapq
+import logging
+
+logger = logging.getLogger("workshopdivision")
+
+POLICIES = ("emptiest", "fair")
+
+
+class FallbackDivision(object):
+    """Put the remaining participants into any workshop they can take.
+
+    Like the original fallback loop every remaining participant gets at
+    most one more workshop. With the "emptiest" policy the participants
+    are placed in their order into the emptiest available workshop, found
+    with a min-heap of the workshops keyed by their occupancy. With the
+    "fair" policy the least satisfied participants are placed first, into
+    the available workshop they give the most points."""
+
+    def __init__(self, workshops, policy="emptiest"):
+        super(FallbackDivision, self).__init__()
+        self.workshops = workshops
+        self.policy = policy
+
+    def getPoints(self, participant):
+        return sum(participant.getPoints(w)
+                   for w in participant.workshops.values() if w is not None)
+
+    def place(self, participant, workshop):
+        day = participant.assignWorkshop(workshop)
+        logger.info("Fallback put %s on %s into %s", participant, day,
+                    workshop)
+        return day
+
+    def placeEmptiest(self, remaining):
+        # occupancy only changes for the workshop that gets a participant,
+        # so every workshop has exactly one entry in the heap until it is
+        # full on all days and dropped for good
+        heap = [(w.getNumParticipants(), w.id, w) for w in self.workshops
+                if w.free_days]
+        heapq.heapify(heap)
+        for p in remaining:
+            # the skipped workshops keep their occupancy and go back as
+            # they are once the participant is placed
+            skipped = []
+            while heap:
+                entry = heapq.heappop(heap)
+                w = entry[2]
+                if p.isAvailable(w):
+                    self.place(p, w)
+                    if w.free_days:
+                        heapq.heappush(heap, (w.getNumParticipants(),
+                                              entry[1], w))
+                    break
+                skipped.append(entry)
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+
+    def placeFair(self, remaining):
+        order = sorted((self.getPoints(p), i, p)
+                       for i, p in enumerate(remaining))
+        workshops = [w for w in self.workshops if w.free_days]
+        for points, i, p in order:
+            # full workshops never get free again in the fallback
+            workshops = [w for w in workshops if w.free_days]
+            if not workshops:
+                break
+            available = [w for w in workshops if p.isAvailable(w)]
+            if available:
+                self.place(p, max(available, key=lambda w: (
+                    p.getPoints(w), -w.getNumParticipants(), -w.id)))
+
+    def run(self, remaining):
+        """Place every remaining participant into one more workshop if
+        possible. Returns the participants that are still not fully
+        assigned."""
+        if self.policy == "fair":
+            self.placeFair(remaining)
+        else:
+            self.placeEmptiest(remaining)
+        return [p for p in remaining if not p.isFullyAssigned()]
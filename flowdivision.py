@@ -0,0 +1,326 @@
+import heapq
+import logging
+from itertools import permutations
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("workshopdivision")
+
+INF = float("inf")
+
+
+class MinCostFlow(object):
+    """Min-cost flow with the primal-dual method on integer costs.
+
+    The edges are stored in flat lists, the reverse of edge e is e ^ 1.
+    Every phase runs Dijkstra on the reduced costs and then pushes a
+    blocking flow over all edges with a reduced cost of zero."""
+
+    def __init__(self, num_nodes):
+        super(MinCostFlow, self).__init__()
+        self.graph = [[] for _ in range(num_nodes)]
+        self.to = []
+        self.cap = []
+        self.cost = []
+
+    def addNode(self):
+        self.graph.append([])
+        return len(self.graph) - 1
+
+    def addEdge(self, u, v, cap, cost):
+        """Add an edge and return its index"""
+        e = len(self.to)
+        self.graph[u].append(e)
+        self.graph[v].append(e + 1)
+        self.to += [v, u]
+        self.cap += [cap, 0]
+        self.cost += [cost, -cost]
+        return e
+
+    def getFlow(self, e):
+        return self.cap[e ^ 1]
+
+    def initPotentials(self, source):
+        """Shortest distances on the initial graph.
+
+        The nodes have to be added in topological order of the edges with
+        capacity, then a single pass over the nodes is enough."""
+        h = [INF] * len(self.graph)
+        h[source] = 0
+        for u in range(len(self.graph)):
+            if h[u] == INF:
+                continue
+            for e in self.graph[u]:
+                if self.cap[e] > 0 and h[u] + self.cost[e] < h[self.to[e]]:
+                    h[self.to[e]] = h[u] + self.cost[e]
+        # unreachable nodes keep a finite potential
+        return [0 if d == INF else d for d in h]
+
+    def dijkstra(self, source, sink, h):
+        dist = [INF] * len(self.graph)
+        dist[source] = 0
+        queue = [(0, source)]
+        to, cap, cost, graph = self.to, self.cap, self.cost, self.graph
+        while queue:
+            d, u = heapq.heappop(queue)
+            if d > dist[u]:
+                continue
+            if u == sink:
+                break
+            for e in graph[u]:
+                if cap[e] > 0:
+                    v = to[e]
+                    nd = d + cost[e] + h[u] - h[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(queue, (nd, v))
+        return dist
+
+    def augment(self, source, sink, h):
+        """Push a blocking flow over the edges with zero reduced cost"""
+        to, cap, cost, graph = self.to, self.cap, self.cost, self.graph
+        flow = 0
+        while True:
+            # levels of the admissible graph
+            level = [-1] * len(graph)
+            level[source] = 0
+            frontier = [source]
+            while frontier and level[sink] < 0:
+                next_frontier = []
+                for u in frontier:
+                    for e in graph[u]:
+                        v = to[e]
+                        if cap[e] > 0 and level[v] < 0 and \
+                                cost[e] + h[u] - h[v] == 0:
+                            level[v] = level[u] + 1
+                            next_frontier.append(v)
+                frontier = next_frontier
+            if level[sink] < 0:
+                return flow
+
+            pointer = [0] * len(graph)
+            while True:
+                pushed = self.pushPath(source, sink, h, level, pointer)
+                if pushed == 0:
+                    break
+                flow += pushed
+
+    def pushPath(self, source, sink, h, level, pointer):
+        """Push one unit along a path of the level graph"""
+        to, cap, cost, graph = self.to, self.cap, self.cost, self.graph
+        path = []
+        u = source
+        while u != sink:
+            edges = graph[u]
+            while pointer[u] < len(edges):
+                e = edges[pointer[u]]
+                v = to[e]
+                if cap[e] > 0 and level[v] == level[u] + 1 and \
+                        cost[e] + h[u] - h[v] == 0:
+                    break
+                pointer[u] += 1
+            else:
+                # dead end, retreat to the previous node
+                if not path:
+                    return 0
+                level[u] = -1
+                e = path.pop()
+                u = to[e ^ 1]
+                pointer[u] += 1
+                continue
+            path.append(e)
+            u = v
+
+        for e in path:
+            cap[e] -= 1
+            cap[e ^ 1] += 1
+        return 1
+
+    def solve(self, source, sink):
+        """Send flow as long as there is a path with negative cost.
+
+        Returns the total flow and cost."""
+        h = self.initPotentials(source)
+        flow = 0
+        phases = 0
+        while True:
+            dist = self.dijkstra(source, sink, h)
+            if dist[sink] == INF:
+                break
+            d_sink = dist[sink]
+            h = [hv + min(d, d_sink) for hv, d in zip(h, dist)]
+            if h[sink] - h[source] >= 0:
+                # further paths do not decrease the cost
+                break
+            flow += self.augment(source, sink, h)
+            phases += 1
+
+        cost = sum(self.cost[e] * self.getFlow(e)
+                   for e in range(0, len(self.to), 2))
+        logger.debug("Min-cost flow of %d with cost %d in %d phases",
+                     flow, cost, phases)
+        return flow, cost
+
+
+class FlowDivision(object):
+    """Heuristic division seeded by a min-cost flow.
+
+    The network is source -> participant -> (participant, workshop) ->
+    (workshop, day) -> sink. The participant edges allow one workshop per
+    free day, the (participant, workshop) edges prevent repeated workshops
+    and the (workshop, day) edges carry the free slots. The cost of a
+    workshop is its negative normalized points scaled to an integer.
+
+    The network does not couple the days of one participant: at most one
+    workshop per day and no repeated workshop can't both be expressed as a
+    flow. So the flow solves a relaxation, schedule() assigns the days of
+    the chosen workshops afterwards and drops what does not fit, and the
+    flow is solved again on what is left for a few rounds. The result is
+    feasible but not guaranteed to be optimal. It usually has more points
+    than the greedy engines, but is much slower than the incremental one.
+    With a preference matrix only the costs are built with numpy."""
+
+    def __init__(self, workshops, participants, scale=10, matrix=None):
+        super(FlowDivision, self).__init__()
+        self.workshops = workshops
+        self.participants = participants
+        self.scale = scale
+        self.matrix = matrix
+
+    def getCosts(self):
+        """Get the scaled points of all available pairs with points"""
+        costs = {}
+        if self.matrix is not None:
+            points, mask = self.matrix.getMaskedPoints(self.participants)
+            scaled = np.rint(points * self.scale).astype(int)
+            rows, columns = np.nonzero(mask & (scaled > 0))
+            for r, c in zip(rows.tolist(), columns.tolist()):
+                costs[(r, self.workshops[c])] = int(scaled[r, c])
+            return costs
+
+        for i, p in enumerate(self.participants):
+            for w in self.workshops:
+                if p.isAvailable(w):
+                    scaled = int(round(p.getPoints(w) * self.scale))
+                    if scaled > 0:
+                        costs[(i, w)] = scaled
+        return costs
+
+    def solve(self):
+        """Get the chosen (workshop, day) pairs per participant index"""
+        costs = self.getCosts()
+        flow = MinCostFlow(0)
+        source = flow.addNode()
+        nodes = [flow.addNode() for p in self.participants]
+        for i, p in enumerate(self.participants):
+            flow.addEdge(source, nodes[i], len(p.getFreeDays()), 0)
+
+        pair_nodes = {}
+        for (i, w) in sorted(costs, key=lambda k: (k[0], k[1].id)):
+            pair_nodes[(i, w)] = flow.addNode()
+            flow.addEdge(nodes[i], pair_nodes[(i, w)], 1, -costs[(i, w)])
+
+        slots = {}
+        for w in self.workshops:
+            for d in w.days:
+                if w.hasFreeSlots(d):
+                    slots[(w, d)] = flow.addNode()
+
+        pair_edges = []
+        for (i, w), node in sorted(pair_nodes.items(),
+                                   key=lambda k: (k[0][0], k[0][1].id)):
+            free_days = self.participants[i].getFreeDays()
+            for d in w.days:
+                if d in free_days and (w, d) in slots:
+                    e = flow.addEdge(node, slots[(w, d)], 1, 0)
+                    pair_edges.append((i, w, d, e))
+
+        sink = flow.addNode()
+        for (w, d), node in slots.items():
+            free = w.max_participants_per_day - w.num_participants[d]
+            flow.addEdge(node, sink, free, 0)
+
+        flow.solve(source, sink)
+
+        chosen = {}
+        for i, w, d, e in pair_edges:
+            if flow.getFlow(e) > 0:
+                chosen.setdefault(i, []).append((w, d))
+        return chosen
+
+    def schedule(self, chosen):
+        """Find days for the chosen workshops of every participant.
+
+        The network picks the days of a participant independently, so they
+        are chosen again here. The participants with the fewest possible
+        day orders go first and take the order that leaves the most free
+        slots. If no order fits, the workshops with the most points are
+        kept. Returns the (participant, workshop, day) triples to assign."""
+        load = {}
+
+        def getFree(w, d):
+            return w.max_participants_per_day - w.num_participants[d] - \
+                load.get((w, d), 0)
+
+        options = {}
+        for i, pairs in chosen.items():
+            p = self.participants[i]
+            workshops = sorted([w for w, d in pairs],
+                               key=p.getPoints, reverse=True)
+            orders = [days for days in permutations(p.getFreeDays(),
+                                                    len(workshops))
+                      if all(w.usesDay(d) for w, d in zip(workshops, days))]
+            options[i] = (workshops, orders)
+
+        assignments = []
+        for i in sorted(chosen, key=lambda i: (len(options[i][1]), i)):
+            p = self.participants[i]
+            workshops, orders = options[i]
+            best = None
+            best_slack = 0
+            for days in orders:
+                slack = min(getFree(w, d) for w, d in zip(workshops, days))
+                if slack > best_slack:
+                    best = zip(workshops, days)
+                    best_slack = slack
+            if best is None:
+                best = self.placePartially(p, workshops, getFree)
+            for w, d in best:
+                load[(w, d)] = load.get((w, d), 0) + 1
+            assignments += [(p, w, d) for w, d in best]
+        return assignments
+
+    def placePartially(self, p, workshops, getFree):
+        """Find days for the workshops with the most points"""
+        best = []
+        best_points = -1
+        for days in permutations(p.getFreeDays(), len(workshops)):
+            placed = [(w, d) for w, d in zip(workshops, days)
+                      if w.usesDay(d) and getFree(w, d) > 0]
+            points = sum(p.getPoints(w) for w, d in placed)
+            if points > best_points:
+                best = placed
+                best_points = points
+
+        logger.info("%s lost %d workshops of the flow because of their days",
+                    p, len(workshops) - len(best))
+        return best
+
+    def run(self, max_rounds=5):
+        """Assign the participants to the workshops chosen by the flow.
+
+        The workshops that were dropped because of their days leave free
+        days and slots behind, so the flow is solved again on them. A
+        participant with a single free day can't get a conflict anymore,
+        which makes the rounds converge quickly."""
+        for i in range(max_rounds):
+            assignments = self.schedule(self.solve())
+            for p, w, d in assignments:
+                p.assignWorkshop(w, d)
+            logger.info("Flow round %d assigned %d workshops", i + 1,
+                        len(assignments))
+            if not assignments:
+                break
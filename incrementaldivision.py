@@ -0,0 +1,112 @@
+import heapq
+import logging
+
+from sparsepreferences import SparsePreferences
+
+logger = logging.getLogger("workshopdivision")
+
+# relative distance of two point sums that is treated as a possible tie
+EPSILON = 1e-7
+
+
+class IncrementalDivision(object):
+    """Greedy division with per-workshop candidate heaps.
+
+    Makes the same assignments as WorkshopDivision.greedyDivision, but keeps
+    running point sums and candidate heaps per workshop and only updates the
+    entries affected by an assignment instead of rescanning everything.
+    Participants without points for a workshop add nothing to its sum and
+    are never its candidate, so only the non-zero points are tracked."""
+
+    def __init__(self, workshops, participants):
+        super(IncrementalDivision, self).__init__()
+        self.workshops = workshops
+        self.participants = participants
+        self.index = {p: i for i, p in enumerate(participants)}
+        preferences = SparsePreferences(workshops, participants)
+        self.points = [dict(preferences.entries[p]) for p in participants]
+        self.available = {w: set() for w in workshops}
+        self.sums = {w: 0.0 for w in workshops}
+
+        for i, p in enumerate(participants):
+            for w, points in preferences.entries[p]:
+                if p.isAvailable(w):
+                    self.available[w].add(i)
+                    self.sums[w] += points
+
+        # the interested participants are sorted, so these are heaps already
+        self.heaps = {}
+        for w in workshops:
+            available = self.available[w]
+            # points are not allowed to be zero!
+            self.heaps[w] = [(negative, i) for negative, i, p
+                             in preferences.interested[w]
+                             if negative < -0.01 and i in available]
+
+    def getCandidate(self, workshop):
+        """Get the available participant with the most points or None"""
+        heap = self.heaps[workshop]
+        available = self.available[workshop]
+        # participants never become available again, so drop stale entries
+        while heap and heap[0][1] not in available:
+            heapq.heappop(heap)
+        if heap:
+            return self.participants[heap[0][1]]
+
+    def getExactSum(self, workshop):
+        """Sum the points in the same order as getSumPointsPerWorkshop"""
+        points = 0.0
+        for i in sorted(self.available[workshop]):
+            points += self.points[i][workshop]
+        return points
+
+    def getNextWorkshop(self):
+        """Get the workshop with the maximum points that has a candidate"""
+        candidates = [w for w in self.workshops
+                      if self.getCandidate(w) is not None]
+        if not candidates:
+            return None
+
+        max_points = max(self.sums[w] for w in candidates)
+        tolerance = EPSILON * max(1.0, abs(max_points))
+        ties = [w for w in candidates
+                if max_points - self.sums[w] <= tolerance]
+        if len(ties) == 1:
+            return ties[0]
+
+        # the running sums may have drifted, decide with the exact sums,
+        # ties go to the lower id like in sortWorkshopsByMaxPoints
+        exact = {w: self.getExactSum(w) for w in ties}
+        return max(ties, key=lambda w: (exact[w], -w.id))
+
+    def removeAvailable(self, workshop, i):
+        self.available[workshop].discard(i)
+        self.sums[workshop] -= self.points[i][workshop]
+
+    def update(self, participant, workshop, day):
+        """Update the entries affected by the assignment"""
+        i = self.index[participant]
+        for w in self.points[i]:
+            if i in self.available[w] and not participant.isAvailable(w):
+                self.removeAvailable(w, i)
+
+        if day is not None and not workshop.hasFreeSlots(day):
+            for j in list(self.available[workshop]):
+                if not self.participants[j].isAvailable(workshop):
+                    self.removeAvailable(workshop, j)
+
+    def run(self):
+        """Assign participants until no workshop has a candidate left.
+
+        Returns the participants that are not fully assigned."""
+        workshop = self.getNextWorkshop()
+        while workshop is not None:
+            participant = self.getCandidate(workshop)
+            logger.info('%s has a maximum of %.1f points for %s',
+                        participant, participant.getPoints(workshop),
+                        workshop)
+            day = participant.assignWorkshop(workshop)
+            self.update(participant, workshop, day)
+            workshop = self.getNextWorkshop()
+
+        return [p for p in self.participants if not p.isFullyAssigned()]
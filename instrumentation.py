@@ -0,0 +1,179 @@
+import cProfile
+import json
+import logging
+import threading
+import time
+from functools import wraps
+
+logger = logging.getLogger("workshopdivision")
+
+# the running instrumentation of every thread
+_local = threading.local()
+# the wrappers installed on the classes, by (class, method name):
+# [original, number of instrumentations that use it]
+_patches = {}
+_patches_lock = threading.Lock()
+
+
+def getCurrent():
+    """Get the instrumentation running in this thread or None"""
+    return getattr(_local, 'instrumentation', None)
+
+
+def install(cls, name):
+    """Replace a method with a wrapper that reports its calls to the
+    instrumentation of the calling thread"""
+    with _patches_lock:
+        if (cls, name) in _patches:
+            _patches[(cls, name)][1] += 1
+            return
+        original = cls.__dict__[name]
+
+        @wraps(original)
+        def wrapper(*args, **kwargs):
+            instrumentation = getattr(_local, 'instrumentation', None)
+            if instrumentation is None:
+                return original(*args, **kwargs)
+            return instrumentation.call(cls, name, original, args, kwargs)
+        _patches[(cls, name)] = [original, 1]
+        setattr(cls, name, wrapper)
+
+
+def uninstall(cls, name):
+    """Put the original method back once no instrumentation uses it"""
+    with _patches_lock:
+        patch = _patches[(cls, name)]
+        patch[1] -= 1
+        if patch[1] == 0:
+            setattr(cls, name, patch[0])
+            del _patches[(cls, name)]
+
+
+def timedPhase(name):
+    """Time a method of an object with an instrumentation attribute as a
+    phase of the instrumentation if it is running"""
+    def decorator(method):
+        @wraps(method)
+        def timed(self, *args, **kwargs):
+            if self.instrumentation is None:
+                return method(self, *args, **kwargs)
+            with self.instrumentation.phase(name):
+                return method(self, *args, **kwargs)
+        return timed
+    return decorator
+
+
+class Phase(object):
+    """Add the wall time of a with block to a phase"""
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.addTime(self.name, time.time() - self.start)
+        return False
+
+
+class Instrumentation(object):
+    """Counters and phase timings of a division run.
+
+    Counting works by replacing methods of the classes with wrappers, so
+    nothing is paid on the hot path while no instrumentation runs. The
+    wrappers are shared by all instrumentations and removed when the last
+    one stops. They only report to the instrumentation started in the
+    calling thread, so concurrent runs in other threads keep their own
+    counters."""
+
+    def __init__(self, counted, timed, profile_file=None):
+        """counted and timed are lists of (class, method name, key)"""
+        super(Instrumentation, self).__init__()
+        self.counted = counted
+        self.timed = timed
+        self.profile_file = profile_file
+        self.profile = None
+        self.previous = None
+        self.counted_keys = {(cls, name): key for cls, name, key in counted}
+        self.timed_keys = {(cls, name): key for cls, name, key in timed}
+        self.phases = {}
+        self.calls = {}
+        self.iterations = []
+        self.iteration_start = None
+
+    def addTime(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def phase(self, name):
+        return Phase(self, name)
+
+    def call(self, cls, name, original, args, kwargs):
+        """Count or time a call of a wrapped method"""
+        key = self.counted_keys.get((cls, name))
+        if key is not None:
+            self.calls[key] += 1
+        key = self.timed_keys.get((cls, name))
+        if key is None:
+            return original(*args, **kwargs)
+        start = time.time()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            self.addTime(key, time.time() - start)
+
+    def getMethods(self):
+        return set(self.counted_keys) | set(self.timed_keys)
+
+    def start(self):
+        for key in self.counted_keys.values():
+            self.calls[key] = 0
+        for cls, name in self.getMethods():
+            install(cls, name)
+        self.previous = getCurrent()
+        _local.instrumentation = self
+        if self.profile_file is not None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop(self):
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.profile_file)
+            logger.info("Wrote profile to %s", self.profile_file)
+            self.profile = None
+        if getCurrent() is self:
+            _local.instrumentation = self.previous
+        self.previous = None
+        for cls, name in self.getMethods():
+            uninstall(cls, name)
+
+    def startIteration(self):
+        self.iteration_start = (time.time(),
+                                self.calls.get("assignWorkshop", 0))
+
+    def endIteration(self):
+        start, assignments = self.iteration_start
+        self.iterations.append({
+            'seconds': time.time() - start,
+            'assignments': self.calls.get("assignWorkshop", 0) - assignments})
+
+    def getSummary(self):
+        return {'phases': dict(self.phases), 'calls': dict(self.calls),
+                'iterations': list(self.iterations)}
+
+    def logSummary(self):
+        summary = self.getSummary()
+        iterations = summary['iterations']
+        logger.warning("Division phases: %s", json.dumps(summary['phases'],
+                                                         sort_keys=True))
+        logger.warning("Division calls: %s", json.dumps(summary['calls'],
+                                                        sort_keys=True))
+        if iterations:
+            logger.warning("%d greedy iterations in %.3fs with %d "
+                           "assignments", len(iterations),
+                           sum(i['seconds'] for i in iterations),
+                           sum(i['assignments'] for i in iterations))
+        return summary
@@ -0,0 +1,124 @@
+import logging
+import random
+import time
+
+logger = logging.getLogger("workshopdivision")
+
+# minimum gain of a move, smaller gains are rounding noise
+EPSILON = 1e-9
+
+
+class LocalSearch(object):
+    """Improve a division with moves and swaps of single workshop-days.
+
+    A move puts a participant on a day into another workshop with a free
+    slot on that day. A swap exchanges the workshops of two participants
+    on the same day. Every candidate is scored by the change of the points
+    of the affected participants only and applied if the total points go
+    up. Capacities, ages and repeated workshops are checked before."""
+
+    def __init__(self, workshops, participants, seed=0):
+        super(LocalSearch, self).__init__()
+        self.workshops = workshops
+        self.participants = participants
+        self.random = random.Random(seed)
+        # the workshops a participant would gain points with, best first
+        self.preferences = {}
+        for p in participants:
+            preferred = [w for w in workshops
+                         if p.age in w.ages and p.getPoints(w) > 0]
+            preferred.sort(key=p.getPoints, reverse=True)
+            self.preferences[p] = preferred
+
+    def getPoints(self, participant, workshop):
+        if workshop is None:
+            return 0.0
+        return participant.getPoints(workshop)
+
+    def tryImprove(self):
+        """Try a random move or swap, returns the gain in points"""
+        p = self.random.choice(self.participants)
+        preferred = self.preferences[p]
+        if not preferred:
+            return 0.0
+        day = self.random.choice(p.available_dates)
+        current = p.getWorkshop(day)
+        current_points = self.getPoints(p, current)
+
+        # only workshops that the participant likes more
+        better = [w for w in preferred if p.getPoints(w) > current_points]
+        if not better:
+            return 0.0
+        target = self.random.choice(better)
+        if target is current or not p.canTake(target, day):
+            return 0.0
+
+        if target.hasFreeSlots(day):
+            gain = p.getPoints(target) - current_points
+            if gain > EPSILON:
+                if current is not None:
+                    p.removeWorkshop(day)
+                p.assignWorkshop(target, day)
+                return gain
+            return 0.0
+
+        if current is None:
+            return 0.0
+        other = self.random.choice(list(target.getParticipantsOfDay(day)))
+        if not other.canTake(current, day):
+            return 0.0
+        gain = p.getPoints(target) - current_points + \
+            other.getPoints(current) - other.getPoints(target)
+        if gain > EPSILON:
+            p.removeWorkshop(day)
+            other.removeWorkshop(day)
+            p.assignWorkshop(target, day)
+            other.assignWorkshop(current, day)
+            return gain
+        return 0.0
+
+    def getTotalPoints(self):
+        return sum(self.getPoints(p, w) for p in self.participants
+                   for w in p.workshops.values())
+
+    def run(self, time_limit=1.0, max_iterations=None, progress=None,
+            progress_interval=0.5):
+        """Improve until the time limit or the iterations are used up.
+
+        progress is called with the current points about every
+        progress_interval seconds. Returns a report with the points before
+        and after the search."""
+        start = time.time()
+        last_progress = start
+        points = self.getTotalPoints()
+        report = {'initial_points': points, 'iterations': 0,
+                  'improvements': 0}
+        if self.participants:
+            while True:
+                if max_iterations is not None and \
+                        report['iterations'] >= max_iterations:
+                    break
+                # checking the clock is slow, only do it every 100 steps
+                if report['iterations'] % 100 == 0 and \
+                        (time_limit is not None or progress is not None):
+                    now = time.time()
+                    if time_limit is not None and now - start >= time_limit:
+                        break
+                    if progress is not None and \
+                            now - last_progress >= progress_interval:
+                        progress(points)
+                        last_progress = now
+                gain = self.tryImprove()
+                if gain > 0:
+                    points += gain
+                    report['improvements'] += 1
+                report['iterations'] += 1
+
+        report['points'] = points
+        report['gain'] = points - report['initial_points']
+        report['seconds'] = time.time() - start
+        logger.warning("Local search gained %.1f points with %d of %d "
+                       "moves in %.1fs", report['gain'],
+                       report['improvements'], report['iterations'],
+                       report['seconds'])
+        return report
@@ -0,0 +1,86 @@
+import logging
+import multiprocessing
+import random
+
+logger = logging.getLogger("workshopdivision")
+
+# the instance data of the worker processes
+_instance = None
+
+
+def scoreDivision(participants):
+    """Get the total points, the number of participants that are not fully
+    assigned and the minimum points of a single participant."""
+    total = 0.0
+    unassigned = 0
+    min_points = None
+    for p in participants:
+        points = 0.0
+        for w in p.workshops.values():
+            if w is not None:
+                points += p.getPoints(w)
+        if not p.isFullyAssigned():
+            unassigned += 1
+        total += points
+        min_points = points if min_points is None else min(min_points,
+                                                           points)
+    return {'points': total, 'unassigned': unassigned,
+            'min_points': min_points or 0.0}
+
+
+def rankScore(score):
+    """Sort key of a score, the best score comes first"""
+    return (score['unassigned'], -score['points'], -score['min_points'])
+
+
+def initWorker(data):
+    global _instance
+    _instance = data
+
+
+def runSeededDivision(args):
+    """Divide a copy of the instance with participants shuffled by seed"""
+    # imported here to avoid the circular import with workshopdivision
+    from workshopdivision import WorkshopDivision
+
+    seed, engine = args
+    division = WorkshopDivision(configure_logging=False)
+    division.loadInstanceData(_instance)
+    reference = division.participants[:]
+    random.Random(seed).shuffle(division.participants)
+    division.startDivision(engine)
+    score = scoreDivision(division.participants)
+    return seed, score, division.getAssignmentData(reference)
+
+
+def startMultiDivision(division, runs, seed, engine, processes):
+    """Run seeded divisions in parallel and keep the best one.
+
+    Returns the seed and the score of the best run."""
+    data = division.getInstanceData()
+    tasks = [(seed + i, engine) for i in range(runs)]
+    if processes == 1:
+        initWorker(data)
+        results = [runSeededDivision(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(processes, initWorker, (data,))
+        try:
+            results = pool.map(runSeededDivision, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    for run_seed, score, assignment in results:
+        logger.info("Division with seed %d: %.1f points, %d unassigned, "
+                    "minimum %.1f points", run_seed, score['points'],
+                    score['unassigned'], score['min_points'])
+
+    # ties go to the lower seed
+    best_seed, best_score, best_assignment = min(
+        results, key=lambda r: (rankScore(r[1]), r[0]))
+    division.loadAssignmentData(best_assignment,
+                                division.getSortedParticipants())
+    logger.warning("Kept the division with seed %d (%.1f points, %d "
+                   "unassigned)", best_seed, best_score['points'],
+                   best_score['unassigned'])
+    return best_seed, best_score
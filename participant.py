@@ -1,56 +1,123 @@
 import logging
+from array import array
 
 logger = logging.getLogger("workshopdivision")
 
+# the type of the points array
+POINTS_TYPE = 'd'
+
+# shared copies of the repeated age and trupp strings
+_strings = {}
+
+
+def internString(s):
+    """Get the shared copy of an equal string"""
+    return _strings.setdefault(s, s)
+
 
 class Participant(object):
-    """docstring for Participant"""
-    def __init__(self, name, age, trupp, points, available_dates):
+    """A participant with its points and workshops.
+
+    The points are a float64 array indexed by the workshop ids and the
+    assigned workshops a list in the order of the available dates, so a
+    participant has no __dict__ and no dicts at all."""
+    __slots__ = ("name", "age", "trupp", "points", "assigned",
+                 "available_dates", "available_mask", "known_mask")
+
+    def __init__(self, name, age, trupp, points, available_dates,
+                 normalize=True):
+        """points is a dict of the workshops or a sequence indexed by the
+        workshop ids, an array of POINTS_TYPE is used as it is"""
         super(Participant, self).__init__()
         self.name = name
-        self.age = age
-        self.trupp = trupp
+        self.age = internString(age)
+        self.trupp = internString(trupp)
+        if isinstance(points, dict):
+            row = [0.0] * (max([w.id for w in points if w is not None] or
+                               [-1]) + 1)
+            for w, p in points.iteritems():
+                if w is not None:
+                    row[w.id] = p
+            points = row
+        if not isinstance(points, array) or points.typecode != POINTS_TYPE:
+            points = array(POINTS_TYPE, points)
         self.points = points
-        self.workshops = {date: None for date in available_dates}
+        self.assigned = [None] * len(available_dates)
         self.available_dates = available_dates
-        self.normalizePoints()
+        # cached availability as bitmasks over the workshop ids
+        self.available_mask = 0
+        self.known_mask = 0
+        if normalize:
+            self.normalizePoints()
+
+    @property
+    def workshops(self):
+        """The assigned workshop (or None) of every available date"""
+        return dict(zip(self.available_dates, self.assigned))
+
+    def getWorkshop(self, day):
+        """Get the assigned workshop of the day or None"""
+        return self.assigned[self.available_dates.index(day)]
 
     def getPoints(self, workshop):
-        points = self.points[workshop]
-        if points is None:
-            logger.warning("%s is not inside Participant %s", workshop,
-                           self.name)
-        else:
+        if workshop.id < len(self.points):
+            points = self.points[workshop.id]
             logger.debug("Get %d Points of Workshop %s from Participant %s",
                          points, workshop, self.name)
             return points
+        logger.warning("%s is not inside Participant %s", workshop,
+                       self.name)
+        return 0.0
 
     def normalizePoints(self):
-        """Get a copy of the normalized points."""
-        sum_points = sum([p for w, p in self.points.iteritems()])
-        sum_points /= float(100)
-        self.points = {w: p / sum_points for w, p in self.points.iteritems()}
+        """Normalize the points to a sum of 100."""
+        sum_points = sum(self.points) / float(100)
+        for i in range(len(self.points)):
+            self.points[i] /= sum_points
 
     def isFullyAssigned(self):
-        for d, w in self.workshops.iteritems():
-            if w is None:
-                return False
+        if None in self.assigned:
+            return False
 
-        logger.debug("Participant %s is fully assigned with workshops: %s",
-                     self, str(self.workshops))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Participant %s is fully assigned with workshops: "
+                         "%s", self, self.workshops)
         return True
 
     def isAvailable(self, workshop):
         """If the participant has a free slot and is not using the workshop"""
+        bit = 1 << workshop.id
+        if self.known_mask & bit:
+            return self.available_mask & bit != 0
+
+        free = self.computeAvailability(workshop)
+        self.known_mask |= bit
+        if free:
+            self.available_mask |= bit
+        else:
+            self.available_mask &= ~bit
+        return free
+
+    def invalidateAvailability(self, workshop=None):
+        """Forget the cached availability of one or all workshops"""
+        if workshop is None:
+            self.known_mask = 0
+        else:
+            self.known_mask &= ~(1 << workshop.id)
+
+    def computeAvailability(self, workshop):
+        """Check the availability without using the cache"""
         free = False
 
         # first check if the workshop is ok with the age
         if self.age not in workshop.ages:
             return False
 
-        for d in self.available_dates:
-            # get the assigned workshop of this day (may be None!)
-            w = self.workshops[d]
+        # only the free slots of the workshop can change the result now
+        workshop.subscribe(self)
+
+        for d, w in zip(self.available_dates, self.assigned):
+            # the assigned workshop of this day may be None!
 
             # check if the workshop is already assigned
             if w is workshop:
@@ -63,21 +130,28 @@ class Participant(object):
 
         return free
 
-    def getFreeDays(self):
-        free_days = []
-        for d, w in self.workshops.iteritems():
-            if w is None:
-                free_days.append(d)
+    def canTake(self, workshop, day):
+        """If the participant can have the workshop on the day, ignoring
+        the capacity and the workshop it has on that day."""
+        if self.age not in workshop.ages or not workshop.usesDay(day):
+            return False
+        for d, w in zip(self.available_dates, self.assigned):
+            if w is workshop and d != day:
+                return False
+        return True
 
-        return free_days
+    def getFreeDays(self):
+        return [d for d, w in zip(self.available_dates, self.assigned)
+                if w is None]
 
-    def assignWorkshop(self, workshop):
-        """Assigns the workshop to a free date"""
-        free_days = self.getFreeDays()
-        day = workshop.getMinDay(free_days)
+    def assignWorkshop(self, workshop, day=None):
+        """Assigns the workshop to the given or the emptiest free date"""
+        if day is None:
+            day = workshop.getMinDay(self.getFreeDays())
         if day is not None:
             workshop.assignParticipant(day, self)
-            self.workshops[day] = workshop
+            self.assigned[self.available_dates.index(day)] = workshop
+            self.invalidateAvailability()
             logger.info("%s assigned for %s on %s with %.1f points",
                         self, workshop, day, self.getPoints(workshop))
         else:
@@ -87,13 +161,25 @@ class Participant(object):
 
         return day
 
+    def removeWorkshop(self, day):
+        """Remove the assigned workshop of the given date"""
+        i = self.available_dates.index(day)
+        workshop = self.assigned[i]
+        if workshop is not None:
+            workshop.removeParticipant(day, self)
+            self.assigned[i] = None
+            self.invalidateAvailability()
+            logger.info("%s removed from %s", self, workshop)
+        return workshop
+
     def clearAssignment(self):
         """Remove the assigned workshops of the participant"""
-        for d in self.workshops:
-            workshop = self.workshops[d]
+        for i, d in enumerate(self.available_dates):
+            workshop = self.assigned[i]
             if workshop is not None:
                 workshop.removeParticipant(d, self)
-                self.workshops[d] = None
+                self.assigned[i] = None
+                self.invalidateAvailability()
                 logger.info("%s removed from %s", self, workshop)
 
     def __str__(self):
@@ -1,12 +1,26 @@
+import argparse
+
 from workshopdivision import WorkshopDivision
 
+parser = argparse.ArgumentParser(description="Divide the participants")
+parser.add_argument("--no-cache", action="store_true",
+                    help="always divide, don't use or fill the result cache")
+parser.add_argument("--seed", type=int, default=None,
+                    help="shuffle the participants with this seed instead "
+                    "of one derived from the content of the csv files")
+args = parser.parse_args()
+
 # start the workshop division
 w = WorkshopDivision()
 w.loadWorkshops("Workshops.csv")
 # w.getWorkshopStatistics()
 w.loadParticipants("Anmeldung.csv")
 # w.getParticipantsStatistics()
-w.startDivision()
+seed = args.seed if args.seed is not None else w.getInputSeed()
+if args.no_cache:
+    w.startSeededDivision(seed=seed)
+else:
+    w.startCachedDivision(seed=seed)
 w.exportDays("export_tage.csv")
 w.exportWorkshops("export_workshop.csv")
 w.exportTrupps("export_trupps.csv")
@@ -0,0 +1,107 @@
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("workshopdivision")
+
+
+def isSupported():
+    """If numpy is installed and the matrix backend can be used"""
+    return np is not None
+
+
+class PreferenceMatrix(object):
+    """The normalized points of the participants as a dense float32 matrix.
+
+    Rows are participants and columns are workshops. The availability of
+    the participants is computed as a boolean mask of the same shape, so
+    the statistics per workshop become masked reductions over the columns.
+    """
+
+    def __init__(self, workshops, participants, dates, points=None):
+        """points is an optional participants x workshops array of the
+        normalized points, like the memory map of a snapshot"""
+        super(PreferenceMatrix, self).__init__()
+        self.workshops = workshops
+        self.dates = dates
+        self.rows = {p: i for i, p in enumerate(participants)}
+        self.columns = {w: i for i, w in enumerate(workshops)}
+        if points is None:
+            points = [[p.getPoints(w) for w in workshops]
+                      for p in participants]
+        self.points = np.array(points, dtype=np.float32)
+        self.points.shape = (len(participants), len(workshops))
+        # the ages never change, so this part of the mask is fixed
+        self.ages = np.array([[p.age in w.ages for w in workshops]
+                              for p in participants], dtype=bool)
+        self.ages.shape = self.points.shape
+        logger.debug("Created preference matrix with %d x %d points",
+                     len(participants), len(workshops))
+
+    def getMask(self, remaining):
+        """Get the availability of the remaining participants per workshop"""
+        num_workshops = len(self.workshops)
+        uses = np.zeros((len(remaining), num_workshops), dtype=bool)
+        free = np.zeros((len(remaining), len(self.dates)), dtype=bool)
+        for r, p in enumerate(remaining):
+            for k, d in enumerate(self.dates):
+                w = p.workshops[d]
+                if w is None:
+                    free[r, k] = True
+                elif w in self.columns:
+                    uses[r, self.columns[w]] = True
+
+        slots = np.array([[w.hasFreeSlots(d) for w in self.workshops]
+                          for d in self.dates], dtype=bool)
+        slots.shape = (len(self.dates), num_workshops)
+        # a free day of the participant that the workshop has slots on
+        reachable = (free[:, :, np.newaxis] & slots[np.newaxis]).any(axis=1)
+
+        rows = [self.rows[p] for p in remaining]
+        return self.ages[rows] & ~uses & reachable
+
+    def getMaskedPoints(self, remaining, fill=0.0):
+        """Get the points of the remaining and the availability mask"""
+        rows = [self.rows[p] for p in remaining]
+        mask = self.getMask(remaining)
+        points = np.where(mask, self.points[rows], np.float32(fill))
+        return points, mask
+
+    def toDict(self, values, valid=None):
+        """Map the values of the columns back to their workshops"""
+        if valid is None:
+            return {w: v for w, v in zip(self.workshops, values.tolist())}
+        return {w: v for w, v, ok in zip(self.workshops, values.tolist(),
+                                         valid.tolist()) if ok}
+
+    def getSumPoints(self, remaining):
+        points, mask = self.getMaskedPoints(remaining)
+        return self.toDict(points.sum(axis=0, dtype=np.float64))
+
+    def getMaxPoints(self, remaining):
+        points, mask = self.getMaskedPoints(remaining)
+        if len(remaining) == 0:
+            return self.toDict(np.zeros(len(self.workshops)))
+        return self.toDict(np.maximum(points.max(axis=0), 0.0))
+
+    def getMedianPoints(self, remaining):
+        """Get the median as the middle element of the sorted points"""
+        points, mask = self.getMaskedPoints(remaining, fill=np.inf)
+        counts = mask.sum(axis=0)
+        if len(remaining) == 0:
+            return {}
+        points.sort(axis=0)
+        # unavailable points are sorted to the end of the columns
+        middle = np.minimum(counts // 2, len(remaining) - 1)
+        median = points[middle, np.arange(len(self.workshops))]
+        return self.toDict(median, counts > 0)
+
+    def getMeanPoints(self, remaining):
+        points, mask = self.getMaskedPoints(remaining)
+        counts = mask.sum(axis=0)
+        sums = points.sum(axis=0, dtype=np.float64)
+        mean = sums / np.maximum(counts, 1)
+        return self.toDict(mean, counts > 0)
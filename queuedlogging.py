@@ -0,0 +1,176 @@
+"""Move the I/O of the logging handlers onto a background thread.
+
+Python 2 has no QueueHandler and QueueListener, so this is a small
+version of them. Every logger that has handlers gets a single
+QueueHandler instead, which puts the prepared records with the replaced
+handlers on a queue. A listener thread takes them from the queue and
+lets the handlers write them in batches, so the division is not
+interrupted for every record."""
+import atexit
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger("workshopdivision")
+
+# the running listener of the process
+_listener = None
+
+# the seconds the listener waits for more records before writing them
+BATCH_INTERVAL = 0.05
+
+
+class QueueHandler(logging.Handler):
+    """Put the records on a queue for the given handlers"""
+
+    def __init__(self, queue, handlers):
+        logging.Handler.__init__(self)
+        self.queue = queue
+        self.handlers = handlers
+
+    def prepare(self, record):
+        """Render the message now, the arguments may change before the
+        listener gets the record"""
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            # Handler.handle holds the lock of this handler for the append
+            # only, the I/O happens on the listener thread
+            self.queue.append((self.handlers, self.prepare(record)))
+        except Exception:
+            self.handleError(record)
+
+
+class QueueListener(object):
+    """Let the handlers of the queued records write them on a thread"""
+
+    def __init__(self, queue):
+        super(QueueListener, self).__init__()
+        self.queue = queue
+        self.thread = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run,
+                                       name="logging-listener")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self):
+        while not self.stopping.is_set():
+            self.stopping.wait(BATCH_INTERVAL)
+            self.write()
+
+    def write(self):
+        """Write all records queued until now"""
+        with self.lock:
+            queue = self.queue
+            while queue:
+                handlers, record = queue.popleft()
+                for handler in handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+
+    def flush(self):
+        """Write all queued records"""
+        self.write()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+        self.write()
+
+
+def isQueued():
+    return _listener is not None
+
+
+def startQueuedLogging():
+    """Replace the handlers of all configured loggers with queue handlers.
+
+    Call it after the logging is configured. Returns False if the logging
+    is already queued."""
+    global _listener
+    if _listener is not None:
+        return False
+
+    queue = deque()
+    loggers = [logging.getLogger()] + [
+        l for l in logging.Logger.manager.loggerDict.values()
+        if isinstance(l, logging.Logger)]
+    for l in loggers:
+        if l.handlers:
+            handlers = l.handlers[:]
+            for handler in handlers:
+                l.removeHandler(handler)
+            l.addHandler(QueueHandler(queue, handlers))
+
+    _listener = QueueListener(queue)
+    _listener.start()
+    atexit.register(stopQueuedLogging)
+    return True
+
+
+def flushQueuedLogging():
+    """Wait until the queued records are written"""
+    if _listener is not None:
+        _listener.flush()
+
+
+def stopQueuedLogging():
+    """Write the queued records and put the handlers back"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for l in [logging.getLogger()] + \
+            list(logging.Logger.manager.loggerDict.values()):
+        for handler in getattr(l, 'handlers', [])[:]:
+            if isinstance(handler, QueueHandler):
+                l.removeHandler(handler)
+                for original in handler.handlers:
+                    l.addHandler(original)
+    _listener = None
+
+
+def startRunLog(filename, level=logging.INFO,
+                format="%(asctime)s - %(levelname)s - %(message)s"):
+    """Write the records of the division from now on also to filename.
+
+    Returns the handler for stopRunLog."""
+    handler = logging.FileHandler(filename, encoding="utf8")
+    handler.setLevel(level)
+    handler.setFormatter(logging.Formatter(format))
+    if _listener is not None:
+        handler = QueueHandler(_listener.queue, [handler])
+    logger.addHandler(handler)
+    return handler
+
+
+def stopRunLog(handler):
+    """Write the queued records and close a run log of startRunLog.
+
+    The run log is detached wherever it is by now: startQueuedLogging may
+    have moved it into a queue handler and stopQueuedLogging may have put
+    its file handler back in place of the queue handler."""
+    files = getattr(handler, 'handlers', [handler])
+    logger.removeHandler(handler)
+    for h in logger.handlers[:]:
+        if h in files:
+            logger.removeHandler(h)
+        elif isinstance(h, QueueHandler):
+            # the queued records keep the old list and are still written
+            h.handlers = [f for f in h.handlers if f not in files]
+    flushQueuedLogging()
+    for h in files:
+        h.close()
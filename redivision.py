@@ -0,0 +1,83 @@
+import logging
+
+from incrementaldivision import IncrementalDivision
+
+logger = logging.getLogger("workshopdivision")
+
+
+class Redivision(object):
+    """Update a finished division for a delta of participants.
+
+    The pending participants, newcomers and everyone a cancellation left
+    with a free day, are put into the free slots by the incremental engine
+    restricted to them. A pending participant that still has a free day
+    may take the place of a settled participant in a full workshop if the
+    settled participant can move to another workshop with a free slot on
+    the same day. Nobody else is touched."""
+
+    def __init__(self, workshops, pending):
+        super(Redivision, self).__init__()
+        self.workshops = workshops
+        self.pending = pending
+
+    def getMove(self, participant, day):
+        """Get the best alternative workshop of the participant on the day
+        that has a free slot, or None."""
+        current = participant.getWorkshop(day)
+        best = None
+        for w in self.workshops:
+            if w is not current and w.hasFreeSlots(day) and \
+                    participant.canTake(w, day) and \
+                    (best is None or
+                     participant.getPoints(w) > participant.getPoints(best)):
+                best = w
+        return best
+
+    def repair(self, participant, day):
+        """Free a slot on the day for the participant by moving one settled
+        participant. Returns the moved participant or None.
+
+        Only full workshops are repaired, and only if the pending
+        participant gains more points than the moved participant loses.
+        The repair with the smallest loss of the moved participant is used,
+        preferred workshops of the pending participant are tried first."""
+        preferred = [w for w in self.workshops
+                     if participant.canTake(w, day) and
+                     participant.getPoints(w) > 0]
+        preferred.sort(key=participant.getPoints, reverse=True)
+        for workshop in preferred:
+            if workshop.hasFreeSlots(day):
+                continue
+            gain = participant.getPoints(workshop)
+            best = None
+            for other in workshop.getParticipantsOfDay(day):
+                target = self.getMove(other, day)
+                if target is None:
+                    continue
+                loss = other.getPoints(workshop) - other.getPoints(target)
+                if best is None or loss < best[0]:
+                    best = (loss, other, target)
+            if best is not None and gain - best[0] > 0:
+                loss, other, target = best
+                other.removeWorkshop(day)
+                other.assignWorkshop(target, day)
+                participant.assignWorkshop(workshop, day)
+                logger.info("Moved %s from %s to %s for %s on %s", other,
+                            workshop, target, participant, day)
+                return other
+
+    def run(self, max_repairs=100):
+        """Place the pending participants and repair at most max_repairs
+        free days. Returns the participants that are not fully assigned."""
+        remaining = IncrementalDivision(self.workshops, self.pending).run()
+        repairs = 0
+        for p in remaining:
+            for day in p.getFreeDays():
+                if repairs >= max_repairs:
+                    break
+                if self.repair(p, day) is not None:
+                    repairs += 1
+
+        logger.warning("Placed %d pending participants with %d repairs",
+                       len(self.pending), repairs)
+        return [p for p in remaining if not p.isFullyAssigned()]
@@ -0,0 +1,69 @@
+import cPickle
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger("workshopdivision")
+
+
+def getKey(*parts):
+    """Get the hex sha1 of the repr of the parts"""
+    return hashlib.sha1(repr(parts)).hexdigest()
+
+
+class ResultCache(object):
+    """Division results on disk, one pickle file per key.
+
+    The modification time of a file is its last use. When the files get
+    larger than max_bytes together, the least recently used are deleted.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        super(ResultCache, self).__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def getFilename(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def get(self, key):
+        """Get the cached result or None"""
+        filename = self.getFilename(key)
+        if not os.path.isfile(filename):
+            return None
+        try:
+            with open(filename, 'rb') as f:
+                result = cPickle.load(f)
+        except (IOError, EOFError, cPickle.UnpicklingError) as e:
+            logger.warning("Can't read cached result %s: %s", filename, e)
+            return None
+        # mark it as used
+        os.utime(filename, None)
+        return result
+
+    def put(self, key, result):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        filename = self.getFilename(key)
+        # write to a temporary file so readers never see half a result
+        temporary = filename + ".tmp"
+        with open(temporary, 'wb') as f:
+            cPickle.dump(result, f, cPickle.HIGHEST_PROTOCOL)
+        os.rename(temporary, filename)
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used results above max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pickle"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort(reverse=True)
+
+        total = 0
+        for mtime, size, name in entries:
+            total += size
+            if total > self.max_bytes:
+                logger.info("Evicting cached result %s", name)
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,106 @@
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("workshopdivision")
+
+# the workshop id of a free day in an assignment array
+FREE = -1
+# the share of the least satisfied participants for the fairness metric
+DECILE = 0.1
+
+
+def isSupported():
+    """If numpy is installed and assignments can be scored in batches"""
+    return np is not None
+
+
+def getAssignmentArray(participants, dates):
+    """Get the assignment as a participant x day array of workshop ids,
+    FREE for the free days"""
+    assignment = np.full((len(participants), len(dates)), FREE, np.int32)
+    for i, p in enumerate(participants):
+        workshops = p.workshops
+        for j, d in enumerate(dates):
+            w = workshops.get(d)
+            if w is not None:
+                assignment[i, j] = w.id
+    return assignment
+
+
+class BatchScorer(object):
+    """Score many assignments of the same participants at once.
+
+    An assignment is a participant x day array of workshop ids (FREE for a
+    free day), a batch is a stack of them. The normalized points of the
+    participants are copied once into a participant x workshop matrix and
+    every score is computed with array operations over the whole batch.
+    The workshop ids are the indices of the workshops."""
+
+    def __init__(self, workshops, participants, dates):
+        super(BatchScorer, self).__init__()
+        self.dates = dates
+        num_workshops = max([w.id for w in workshops] or [-1]) + 1
+        self.points = np.zeros((len(participants), num_workshops))
+        for i, p in enumerate(participants):
+            row = p.points.tolist()[:num_workshops]
+            self.points[i, :len(row)] = row
+        self.capacity = np.zeros((num_workshops, len(dates)), np.int64)
+        for w in workshops:
+            for j, d in enumerate(dates):
+                if w.usesDay(d):
+                    self.capacity[w.id, j] = w.max_participants_per_day
+
+    def score(self, assignments):
+        """Score a batch of assignments (or a single one).
+
+        Returns a dict of arrays with one entry per assignment: the total
+        points, the points of every participant, the number of participants
+        with a free day, the fill rate of every workshop, the number of
+        overfull workshop-days and the mean points of the least satisfied
+        tenth of the participants."""
+        assignments = np.asarray(assignments)
+        single = assignments.ndim == 2
+        if single:
+            assignments = assignments[np.newaxis]
+        batch, num_participants, num_days = assignments.shape
+        num_workshops, num_dates = self.capacity.shape
+
+        assigned = assignments != FREE
+        ids = np.where(assigned, assignments, 0)
+        rows = np.arange(num_participants)[np.newaxis, :, np.newaxis]
+        participant_points = np.where(assigned, self.points[rows, ids],
+                                      0.0).sum(axis=2)
+
+        # count the participants of every workshop-day of every assignment
+        days = np.arange(num_days)[np.newaxis, np.newaxis, :]
+        batches = np.arange(batch)[:, np.newaxis, np.newaxis]
+        cells = (batches * num_workshops + ids) * num_dates + days
+        counts = np.bincount(cells[assigned],
+                             minlength=batch * num_workshops * num_dates)
+        counts = counts.reshape(batch, num_workshops, num_dates)
+
+        places = self.capacity.sum(axis=1).astype(float)
+        fill_rates = counts.sum(axis=2) / np.where(places > 0, places, 1.0)
+
+        lowest = max(1, int(num_participants * DECILE))
+        if num_participants:
+            ordered = np.sort(participant_points, axis=1)
+            lowest_decile = ordered[:, :lowest].mean(axis=1)
+        else:
+            lowest_decile = np.zeros(batch)
+
+        scores = {
+            'points': participant_points.sum(axis=1),
+            'participant_points': participant_points,
+            'unassigned': (~assigned).any(axis=2).sum(axis=1),
+            'fill_rates': fill_rates,
+            'overfull': (counts > self.capacity).sum(axis=(1, 2)),
+            'lowest_decile': lowest_decile,
+        }
+        if single:
+            scores = {k: v[0] for k, v in scores.iteritems()}
+        return scores
@@ -0,0 +1,133 @@
+import logging
+import multiprocessing
+
+logger = logging.getLogger("workshopdivision")
+
+
+def findComponents(workshops, ages):
+    """Get the ages and workshops that are connected by shared workshops.
+
+    Participants of an age can only take the workshops of their age, so
+    the components of the ages and workshops are the independent parts of
+    the participant-workshop compatibility graph."""
+    parent = {a: a for a in ages}
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for w in workshops:
+        known = [a for a in w.ages if a in parent]
+        for a in known[1:]:
+            parent[find(a)] = find(known[0])
+
+    components = {}
+    for a in ages:
+        components.setdefault(find(a), ([], []))[0].append(a)
+    for w in workshops:
+        known = [a for a in w.ages if a in parent]
+        if known:
+            components[find(known[0])][1].append(w)
+    return [components[find(a)] for a in ages if find(a) == a]
+
+
+def splitCapacity(capacity, demands):
+    """Split the capacity proportionally to the demands.
+
+    The largest remainders get the rounded off places."""
+    total = float(sum(demands))
+    if total <= 0:
+        demands = [1] * len(demands)
+        total = float(len(demands))
+    shares = [capacity * d / total for d in demands]
+    split = [int(s) for s in shares]
+    rest = sorted(range(len(shares)), key=lambda i: split[i] - shares[i])
+    for i in rest[:capacity - sum(split)]:
+        split[i] += 1
+    return split
+
+
+def getShards(division, split=True):
+    """Get the independent shards of the division.
+
+    A shard is a tuple of its ages, participants and a list of its
+    workshops with their capacity per day. With split, a component with
+    several ages is divided into one shard per age and the capacity of
+    the shared workshops is split by the points the ages give them."""
+    shards = []
+    for ages, workshops in findComponents(division.workshops,
+                                          division.available_ages):
+        groups = [[a] for a in ages] if split else [ages]
+        members = [[p for p in division.participants if p.age in g]
+                   for g in groups]
+        demand = [{w: sum(p.getPoints(w) for p in m) for w in workshops}
+                  for m in members]
+        capacities = {}
+        for w in workshops:
+            users = [i for i, g in enumerate(groups)
+                     if any(a in w.ages for a in g)]
+            for i, c in zip(users, splitCapacity(
+                    w.max_participants_per_day,
+                    [demand[i][w] for i in users])):
+                capacities[(i, w)] = c
+
+        for i, g in enumerate(groups):
+            shard_workshops = [(w, capacities[(i, w)]) for w in workshops
+                               if (i, w) in capacities]
+            shards.append((g, members[i], shard_workshops))
+    return shards
+
+
+def getShardData(division, shard):
+    """Get the instance data of a shard for loadInstanceData"""
+    ages, participants, workshops = shard
+    return (division.available_dates, ages,
+            [(w.name, w.supervisor, w.ages, w.days, capacity)
+             for w, capacity in workshops],
+            [(p.name, p.age, p.trupp,
+              [p.getPoints(w) for w, capacity in workshops])
+             for p in participants])
+
+
+def solveShard(args):
+    """Divide one shard without the fallback for the remaining"""
+    # imported here to avoid the circular import with workshopdivision
+    from workshopdivision import WorkshopDivision
+
+    data, engine = args
+    division = WorkshopDivision(configure_logging=False)
+    division.loadInstanceData(data)
+    division.startDivision(engine, fallback=False)
+    return division.getAssignmentData(division.participants)
+
+
+def startShardedDivision(division, engine, processes, split):
+    """Divide the shards independently and merge their assignments.
+
+    Returns the number of shards."""
+    shards = getShards(division, split)
+    tasks = [(getShardData(division, shard), engine) for shard in shards]
+    logger.info("Dividing %d shards: %s", len(shards),
+                ", ".join("%s (%d participants, %d workshops)" %
+                          ("/".join(ages), len(p), len(w))
+                          for ages, p, w in shards))
+
+    if len(tasks) > 1 and processes != 1:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(solveShard, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [solveShard(task) for task in tasks]
+
+    for (ages, participants, workshops), (order, rosters) in zip(shards,
+                                                                 results):
+        for (w, capacity), days in zip(workshops, rosters):
+            for d, indices in zip(w.days, days):
+                for i in indices:
+                    participants[i].assignWorkshop(w, d)
+    return len(shards)
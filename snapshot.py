@@ -0,0 +1,118 @@
+import cPickle
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("workshopdivision")
+
+MAGIC = "WDSNAP1\n"
+# the length of the pickled header after the magic
+HEADER = struct.Struct("<Q")
+
+
+def hashFiles(filenames):
+    """Get the sha1 of the content of every file"""
+    hashes = []
+    for filename in filenames:
+        sha = hashlib.sha1()
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        hashes.append(sha.hexdigest())
+    return hashes
+
+
+def writeSnapshot(filename, data, assignment=None, hashes=None):
+    """Write the instance data of getInstanceData, the assignment of
+    getAssignmentData and the hashes of the source files.
+
+    The points are written as a raw little endian float64 matrix after the
+    pickled rest, so they can be read without unpickling."""
+    dates, ages, workshops, participants = data
+    header = cPickle.dumps({
+        'hashes': hashes,
+        'dates': dates,
+        'ages': ages,
+        'workshops': workshops,
+        'participants': [(name, age, trupp)
+                         for name, age, trupp, points in participants],
+        'assignment': assignment}, cPickle.HIGHEST_PROTOCOL)
+
+    points = array('d')
+    for name, age, trupp, row in participants:
+        points.extend(row)
+    if sys.byteorder != 'little':
+        points.byteswap()
+
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(len(header)))
+        f.write(header)
+        # align the matrix for the memory map
+        f.write(b"\0" * (-f.tell() % 8))
+        points.tofile(f)
+
+
+def readSnapshot(filename):
+    """Read a snapshot of writeSnapshot.
+
+    Returns the hashes, the instance data, the assignment and the points
+    as a participants x workshops numpy memory map of the file, or None if
+    the file is not a snapshot. The memory map is None without numpy. The
+    points of the participants in the instance data are float64 arrays
+    copied from the file."""
+    if not os.path.isfile(filename):
+        logger.error("Filename %s does not exist", filename)
+        return None
+
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            logger.error("%s is not a division snapshot", filename)
+            return None
+        length, = HEADER.unpack(f.read(HEADER.size))
+        header = cPickle.loads(f.read(length))
+        offset = f.tell() + (-f.tell() % 8)
+
+        participants = header['participants']
+        num_workshops = len(header['workshops'])
+        count = len(participants) * num_workshops
+        matrix = None
+        if count:
+            if np is not None:
+                matrix = np.memmap(f, dtype='<f8', mode='r', offset=offset,
+                                   shape=(len(participants), num_workshops))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                rows = readRows(mapped, offset, len(participants),
+                                num_workshops)
+            finally:
+                mapped.close()
+        else:
+            rows = [array('d') for p in participants]
+
+    data = (header['dates'], header['ages'], header['workshops'],
+            [(name, age, trupp, points)
+             for (name, age, trupp), points in zip(participants, rows)])
+    return header['hashes'], data, header['assignment'], matrix
+
+
+def readRows(mapped, offset, num_rows, num_workshops):
+    """Get the rows of the point matrix of a mapped snapshot as arrays"""
+    size = num_workshops * array('d').itemsize
+    rows = []
+    for i in range(num_rows):
+        row = array('d')
+        row.fromstring(mapped[offset + i * size:offset + (i + 1) * size])
+        if sys.byteorder != 'little':
+            row.byteswap()
+        rows.append(row)
+    return rows
@@ -0,0 +1,125 @@
+import bisect
+import logging
+from collections import Counter
+
+logger = logging.getLogger("workshopdivision")
+
+
+class SparsePreferences(object):
+    """The non-zero normalized points of the participants.
+
+    Every participant has a list of (workshop, points) sorted by the
+    workshop ids and every workshop an inverted index of the interested
+    participants as (-points, index, participant) sorted by the most points
+    and then the order of the participants. The statistics only visit the
+    non-zero pairs, the participants without points for a workshop are
+    only counted by their age and free days."""
+
+    def __init__(self, workshops, participants):
+        super(SparsePreferences, self).__init__()
+        self.workshops = workshops
+        by_id = {w.id: w for w in workshops}
+        self.entries = {}
+        self.interested = {w: [] for w in workshops}
+        num_entries = 0
+        for i, p in enumerate(participants):
+            entries = [(by_id[k], v) for k, v in enumerate(p.points)
+                       if v and k in by_id]
+            self.entries[p] = entries
+            for w, v in entries:
+                self.interested[w].append((-v, i, p))
+            num_entries += len(entries)
+        for w in workshops:
+            self.interested[w].sort()
+        logger.debug("Created sparse preferences with %d of %d x %d points",
+                     num_entries, len(participants), len(workshops))
+
+    def getSumPoints(self, remaining):
+        all_points = {w: 0.0 for w in self.workshops}
+        for p in remaining:
+            for w, points in self.entries[p]:
+                if p.isAvailable(w):
+                    all_points[w] += points
+        return all_points
+
+    def getMaxPoints(self, remaining):
+        all_points = {w: 0.0 for w in self.workshops}
+        for p in remaining:
+            for w, points in self.entries[p]:
+                if p.isAvailable(w) and points > all_points[w]:
+                    all_points[w] = points
+        return all_points
+
+    def getAvailablePoints(self, remaining):
+        """Get the non-zero points of the available remaining per workshop"""
+        all_points = {w: [] for w in self.workshops}
+        for p in remaining:
+            for w, points in self.entries[p]:
+                if p.isAvailable(w):
+                    all_points[w].append(points)
+        return all_points
+
+    def getAvailableCounts(self, remaining):
+        """Count the available remaining per workshop, with zero points.
+
+        A participant is available if the workshop takes its age and has
+        free slots on one of its free days, unless it is already assigned
+        to the workshop. So the participants are grouped by age and free
+        days and only the assigned participants are visited."""
+        groups = Counter((p.age, tuple(p.getFreeDays())) for p in remaining)
+        remaining = set(remaining)
+        counts = {}
+        for w in self.workshops:
+            def takes(age, free_days):
+                return age in w.ages and \
+                    any(w.hasFreeSlots(d) for d in free_days)
+            count = sum(n for (age, free_days), n in groups.iteritems()
+                        if takes(age, free_days))
+            for d in w.days:
+                for p in w.getParticipantsOfDay(d):
+                    if p in remaining and takes(p.age, p.getFreeDays()):
+                        count -= 1
+            counts[w] = count
+        return counts
+
+    def getMedianPoints(self, remaining):
+        """Get the middle element of the sorted points, with the zeros of
+        the available participants without points"""
+        counts = self.getAvailableCounts(remaining)
+        median_points = {}
+        for w, points in self.getAvailablePoints(remaining).iteritems():
+            count = counts[w]
+            if count:
+                points.sort()
+                zeros = count - len(points)
+                middle = count / 2
+                negative = bisect.bisect_left(points, 0.0)
+                if middle < negative:
+                    median_points[w] = points[middle]
+                elif middle < negative + zeros:
+                    median_points[w] = 0.0
+                else:
+                    median_points[w] = points[middle - zeros]
+        return median_points
+
+    def getMeanPoints(self, remaining):
+        counts = self.getAvailableCounts(remaining)
+        mean_points = {}
+        for w, points in self.getAvailablePoints(remaining).iteritems():
+            if counts[w]:
+                mean_points[w] = sum(points) / counts[w]
+        return mean_points
+
+    def getParticipantWithMaxPoints(self, workshop, remaining=None):
+        """Get the first available participant with the most points above
+        0.01 and its points or (None, 0.01).
+
+        remaining is None or a set, it is only used for lookups."""
+        for negative, i, p in self.interested[workshop]:
+            # points are not allowed to be zero!
+            if -negative <= 0.01:
+                break
+            if (remaining is None or p in remaining) and \
+                    p.isAvailable(workshop):
+                return p, -negative
+        return None, 0.01
@@ -0,0 +1,62 @@
+"""Small random camps for the tests."""
+import logging
+import random
+
+from workshopdivision import WorkshopDivision
+
+logging.getLogger("workshopdivision").addHandler(logging.NullHandler())
+
+AGES = [u"GuSp", u"CaEx"]
+DATES = [u"Sa", u"Mi"]
+
+
+def createDivision(num_participants=200, num_workshops=20, ratings=5,
+                   seed=0):
+    """Create a division of random workshops and participants that give
+    points to ratings workshops each, shuffled with the seed"""
+    rng = random.Random(seed)
+    division = WorkshopDivision(configure_logging=False)
+    capacity = max(2, 2 * num_participants / num_workshops)
+    for i in range(num_workshops):
+        ages = rng.choice([u"GuSp, CaEx", u"GuSp, CaEx", u"GuSp", u"CaEx"])
+        dates = rng.choice([u"Sa, Mi", u"Sa, Mi", u"Sa", u"Mi"])
+        division.addWorkshop(u"Workshop %d" % i, u"Chef %d" % i, ages,
+                             str(rng.randint(capacity / 2, capacity)), dates)
+
+    for i in range(num_participants):
+        points = [0] * num_workshops
+        for k in rng.sample(range(num_workshops), ratings):
+            points[k] = rng.randint(1, 10)
+        division.addParticipant(u"Participant %d" % i, rng.choice(AGES),
+                                u"Trupp %d" % rng.randint(0, 9), points)
+    rng.shuffle(division.participants)
+    return division
+
+
+def getAssignment(division):
+    """Get the workshop names by (participant name, day)"""
+    return {(p.name, d): w.name for p in division.participants
+            for d, w in p.workshops.iteritems() if w is not None}
+
+
+def getTotalPoints(division):
+    return sum(p.getPoints(w) for p in division.participants
+               for w in p.workshops.itervalues() if w is not None)
+
+
+def checkFeasible(test, division):
+    """Assert that no workshop is overfull, nobody takes a workshop twice
+    or on a day it does not use and the ages fit"""
+    for w in division.workshops:
+        for d in w.days:
+            test.assertLessEqual(w.num_participants[d],
+                                 w.max_participants_per_day)
+            test.assertEqual(len(w.participants[d]), w.num_participants[d])
+    for p in division.participants:
+        assigned = [(d, w) for d, w in p.workshops.iteritems()
+                    if w is not None]
+        test.assertEqual(len(set(w for d, w in assigned)), len(assigned))
+        for d, w in assigned:
+            test.assertTrue(w.usesDay(d))
+            test.assertIn(p.age, w.ages)
+            test.assertIn(p, w.participants[d])
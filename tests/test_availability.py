@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from tests.common import createDivision
+
+
+class AvailabilityCacheTest(unittest.TestCase):
+
+    def checkCache(self, division):
+        for p in division.participants:
+            for w in division.workshops:
+                self.assertEqual(p.isAvailable(w), p.computeAvailability(w),
+                                 "%s for %s" % (p, w))
+
+    def test_cache_follows_assignments_and_removals(self):
+        rng = random.Random(0)
+        division = createDivision(num_participants=60, num_workshops=8)
+        self.checkCache(division)
+        for step in range(400):
+            p = rng.choice(division.participants)
+            if rng.random() < 0.7:
+                w = rng.choice(division.workshops)
+                if p.isAvailable(w):
+                    p.assignWorkshop(w)
+            else:
+                p.removeWorkshop(rng.choice(p.available_dates))
+            if step % 50 == 0:
+                self.checkCache(division)
+        self.checkCache(division)
+
+    def test_full_workshop_invalidates_other_participants(self):
+        division = createDivision(num_participants=40, num_workshops=4,
+                                  ratings=2)
+        w = division.workshops[0]
+        candidates = [p for p in division.participants if p.isAvailable(w)]
+        for p in candidates:
+            if p.isAvailable(w):
+                p.assignWorkshop(w)
+        self.assertFalse(any(p.isAvailable(w)
+                             for p in division.participants))
+        self.checkCache(division)
+        for p in candidates:
+            p.clearAssignment()
+        self.checkCache(division)
+
+
+if __name__ == '__main__':
+    unittest.main()
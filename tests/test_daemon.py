@@ -0,0 +1,108 @@
+import httplib
+import json
+import threading
+import unittest
+
+from daemon import DivisionServer, DivisionService
+from tests.common import createDivision
+
+
+class DaemonTest(unittest.TestCase):
+
+    def setUp(self):
+        division = createDivision(num_participants=50, num_workshops=5,
+                                  ratings=2)
+        division.startDivision("incremental")
+        self.service = DivisionService(division)
+        self.server = DivisionServer(("127.0.0.1", 0), self.service)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def request(self, method, path, data=None):
+        connection = httplib.HTTPConnection(*self.server.server_address)
+        body = data if isinstance(data, str) else json.dumps(data)
+        connection.request(method, path, body if data is not None else None)
+        response = connection.getresponse()
+        result = response.status, json.loads(response.read())
+        connection.close()
+        return result
+
+    def post(self, data):
+        return self.request("POST", "/participants", data)
+
+    def test_add_participant(self):
+        status, data = self.post({'name': "Neu", 'stufe': "GuSp",
+                                  'points': {"Workshop 1": 3,
+                                             "Workshop 2": 1.5}})
+        self.assertEqual(status, 201)
+        self.assertEqual(data['name'], "Neu")
+        status, data = self.request("GET", "/participants/Neu")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(data), 1)
+
+    def test_invalid_participants(self):
+        for data in [{'name': "A", 'stufe': "GuSp",
+                      'points': {"Workshop 1": "abc"}},
+                     {'name': "A", 'stufe': "GuSp",
+                      'points': {"Workshop 1": True}},
+                     {'name': "A", 'stufe': "GuSp",
+                      'points': {"Workshop 1": -1}},
+                     {'name': "A", 'stufe': "GuSp",
+                      'points': {"Unknown": 1}},
+                     {'name': "A", 'stufe': "GuSp", 'points': [1, 2]},
+                     {'name': "A", 'stufe': "GuSp", 'points': {}},
+                     {'name': "A", 'stufe': "Rover",
+                      'points': {"Workshop 1": 1}},
+                     {'name': 5, 'stufe': "GuSp",
+                      'points': {"Workshop 1": 1}},
+                     {'stufe': "GuSp"},
+                     [1, 2], "[1, 2"]:
+            status, response = self.post(data)
+            self.assertEqual(status, 400, data)
+            self.assertIn('error', response)
+        # the server still answers and nobody was added
+        status, data = self.request("GET", "/status")
+        self.assertEqual(status, 200)
+        self.assertEqual(data['participants'], 50)
+
+    def test_unknown_engine(self):
+        for engine in ["bogus", 3, None, ["greedy"]]:
+            status, response = self.request("POST", "/division",
+                                            {'engine': engine})
+            self.assertEqual(status, 400, engine)
+            self.assertIn('error', response)
+        # the division is kept
+        status, data = self.request("GET", "/status")
+        self.assertLess(data['unassigned'], 50)
+
+    def test_removed_unsubscribed(self):
+        division = self.service.division
+        participants = self.service.findParticipants(
+            division.participants[0].name)
+        self.request("DELETE", "/participants/%s" %
+                     participants[0].name.replace(" ", "%20"))
+        for w in division.workshops:
+            for p in participants:
+                self.assertNotIn(p, w.subscribers)
+
+    def test_statistics(self):
+        status, data = self.request("GET", "/statistics")
+        self.assertEqual(status, 200)
+        self.assertEqual(data['participants'], 50)
+        self.assertEqual(len(data['workshops']), 5)
+
+    def test_statistics_during_division(self):
+        # a running division holds the write lock
+        with self.service.lock.writing():
+            status, data = self.request("GET", "/statistics")
+        self.assertEqual(status, 200)
+        self.assertEqual(data['participants'], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import unittest
+
+from divisionstatistics import getBin, NUM_BINS
+from tests.common import AGES, createDivision
+
+
+class DivisionStatisticsTest(unittest.TestCase):
+
+    def assertCounters(self, division):
+        """Compare the live statistics with a count from scratch"""
+        statistics = division.getStatistics()
+        demand = {w: [0, 0.0] for w in division.workshops}
+        histogram = [0] * NUM_BINS
+        total = 0.0
+        full = 0
+        for p in division.participants:
+            assigned = [w for w in p.workshops.itervalues()
+                        if w is not None]
+            free = [d for d, w in p.workshops.iteritems() if w is None]
+            points = sum(p.getPoints(w) for w in assigned)
+            total += points
+            histogram[getBin(points)] += 1
+            if not free:
+                full += 1
+                continue
+            for w in division.workshops:
+                value = p.getPoints(w)
+                if value and p.age in w.ages and w not in assigned and \
+                        any(w.usesDay(d) for d in free):
+                    demand[w][0] += 1
+                    demand[w][1] += value
+
+        summary = statistics.getSummary()
+        self.assertEqual(summary['participants'], len(division.participants))
+        self.assertEqual(summary['fully_assigned'], full)
+        self.assertAlmostEqual(summary['points'], total)
+        self.assertEqual(summary['histogram'], histogram)
+        for w in division.workshops:
+            count, points = statistics.getDemand(w)
+            self.assertEqual(count, demand[w][0])
+            self.assertAlmostEqual(points, demand[w][1])
+            self.assertEqual(statistics.getWorkshopSummary(w)['assigned'],
+                             sum(w.num_participants.values()))
+        # the available participants as Participant.isAvailable sees them
+        available = division.getMeanPointsPerWorkshop()
+        mean_points = statistics.getMeanAvailablePoints()
+        self.assertEqual(sorted(mean_points), sorted(available))
+        for w, mean in available.iteritems():
+            self.assertAlmostEqual(mean_points[w], mean)
+
+    def test_follows_division(self):
+        division = createDivision(seed=14)
+        self.assertCounters(division)
+        division.startDivision("incremental", fallback=False)
+        self.assertCounters(division)
+        division.assignRemainingParticipants(
+            [p for p in division.participants if not p.isFullyAssigned()])
+        self.assertCounters(division)
+
+    def test_follows_updates(self):
+        rng = random.Random(1)
+        division = createDivision(seed=15)
+        division.getStatistics()
+        division.startDivision("incremental")
+        removed = rng.sample(division.participants, 20)
+        for i in range(10):
+            points = [0] * len(division.workshops)
+            points[rng.randrange(len(points))] = 5
+            division.addParticipant(u"Late %d" % i, rng.choice(AGES),
+                                    u"Trupp 1", points)
+        self.assertCounters(division)
+        division.updateDivision(removed)
+        self.assertCounters(division)
+
+    def test_participant_statistics(self):
+        division = createDivision(seed=16)
+        division.startDivision("incremental", fallback=False)
+        data = division.getParticipantsStatistics()
+        statistics = division.getStatistics()
+        self.assertEqual(data['platz'], statistics.getMeanAvailablePoints())
+        self.assertEqual(data['zugeteilt'],
+                         statistics.getSummary()['fully_assigned'])
+        for w, mean in data['nachfrage'].iteritems():
+            count, points = statistics.getDemand(w)
+            self.assertAlmostEqual(mean, points / count)
+
+
+if __name__ == '__main__':
+    unittest.main()
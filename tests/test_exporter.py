@@ -0,0 +1,89 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import exporter
+from tests.common import createDivision
+
+
+def readCsv(filename):
+    with open(filename, 'rb') as f:
+        return [[c.decode('utf-8') for c in row] for row in csv.reader(f)]
+
+
+class ExporterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.division = createDivision(num_participants=120, seed=8)
+        self.division.startDivision("incremental")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def getPath(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_days_like_original_export(self):
+        # the loop of the original exportDays
+        expected = [list(exporter.VIEWS['days'])]
+        for d in self.division.available_dates:
+            for w in self.division.workshops:
+                if w.usesDay(d):
+                    for p in w.getParticipantsOfDay(d):
+                        expected.append([d, w.name, p.name, p.age, p.trupp,
+                                         unicode(p.getPoints(w))])
+        self.division.exportDays(self.getPath("days.csv"))
+        self.assertEqual(readCsv(self.getPath("days.csv")), expected)
+
+    def test_views_have_the_same_rows(self):
+        written = self.division.exportAll(self.getPath("export"))
+        self.assertEqual(len(written), 4)
+        days = readCsv(self.getPath("export_days.csv"))
+        for view in ["workshops", "trupps"]:
+            rows = readCsv(self.getPath("export_%s.csv" % view))
+            columns = [rows[0].index(c) for c in days[0]]
+            self.assertEqual(sorted([row[i] for i in columns]
+                                    for row in rows[1:]), sorted(days[1:]))
+
+    def test_trupps_in_participant_order(self):
+        self.division.exportTrupps(self.getPath("trupps.csv"))
+        names = [row[2] for row in readCsv(self.getPath("trupps.csv"))[1:]]
+        expected = [p.name for p in self.division.participants
+                    for d in self.division.available_dates
+                    if p.getWorkshop(d) is not None]
+        self.assertEqual(names, expected)
+
+    def test_rosters(self):
+        self.division.exportAll(self.getPath("export"), views=["rosters"])
+        rows = readCsv(self.getPath("export_rosters.csv"))[1:]
+        self.assertEqual(len(rows), sum(len(w.days)
+                                        for w in self.division.workshops))
+        for name, day, leitung, count, places, names in rows:
+            w = self.division.getWorkshop(name)
+            self.assertEqual(int(count), w.num_participants[day])
+            self.assertEqual(int(places), w.max_participants_per_day)
+
+    def test_json_lines(self):
+        self.division.exportAll(self.getPath("export"), views=["days"],
+                                formats=["jsonl"])
+        with open(self.getPath("export_days.jsonl")) as f:
+            lines = [json.loads(line) for line in f]
+        rows = exporter.Exporter(self.division).getRows("days")
+        self.assertEqual(len(lines), len(rows))
+        for line, row in zip(lines, rows):
+            self.assertEqual([line[c] for c in exporter.VIEWS['days']],
+                             list(row))
+
+    def test_unknown_view_and_format(self):
+        views = exporter.Exporter(self.division)
+        self.assertFalse(views.write(self.getPath("x"), "unknown"))
+        self.assertFalse(views.write(self.getPath("x"), "days", "xml"))
+        self.assertFalse(os.path.exists(self.getPath("x")))
+
+
+if __name__ == '__main__':
+    unittest.main()
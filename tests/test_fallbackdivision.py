@@ -0,0 +1,62 @@
+import unittest
+
+from fallbackdivision import FallbackDivision
+from incrementaldivision import IncrementalDivision
+from tests.common import createDivision, getAssignment, checkFeasible
+
+
+def countAssigned(p):
+    return len([w for w in p.workshops.itervalues() if w is not None])
+
+
+class FallbackDivisionTest(unittest.TestCase):
+
+    def divide(self, seed):
+        """Divide a camp with scarce places without the fallback"""
+        division = createDivision(num_participants=300, num_workshops=12,
+                                  ratings=3, seed=seed)
+        remaining = IncrementalDivision(division.workshops,
+                                        division.participants).run()
+        self.assertTrue(remaining)
+        return division, remaining
+
+    def placeReference(self, division, remaining):
+        """The original loop, every participant goes into the emptiest
+        workshop it can take"""
+        for p in remaining:
+            workshops = sorted(division.workshops, key=lambda w: (
+                w.getNumParticipants(), w.id))
+            for w in workshops:
+                if p.isAvailable(w):
+                    p.assignWorkshop(w)
+                    break
+
+    def test_emptiest_same_as_loop(self):
+        for seed in range(3):
+            division, remaining = self.divide(seed)
+            FallbackDivision(division.workshops).run(remaining)
+            checkFeasible(self, division)
+            heap = getAssignment(division)
+
+            for p in division.participants:
+                p.clearAssignment()
+            IncrementalDivision(division.workshops,
+                                division.participants).run()
+            self.placeReference(division, remaining)
+            self.assertEqual(heap, getAssignment(division))
+
+    def test_one_workshop_per_participant(self):
+        for policy in ["emptiest", "fair"]:
+            division, remaining = self.divide(4)
+            before = {p: countAssigned(p) for p in remaining}
+            left = FallbackDivision(division.workshops, policy).run(
+                remaining)
+            checkFeasible(self, division)
+            for p in remaining:
+                self.assertLessEqual(countAssigned(p), before[p] + 1)
+            self.assertEqual(left, [p for p in remaining
+                                    if not p.isFullyAssigned()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from flowdivision import MinCostFlow, FlowDivision
+from tests.common import createDivision, getTotalPoints, checkFeasible
+
+
+class MinCostFlowTest(unittest.TestCase):
+
+    def test_takes_cheapest_paths(self):
+        flow = MinCostFlow(4)
+        cheap = flow.addEdge(0, 1, 1, -5)
+        expensive = flow.addEdge(0, 2, 1, -1)
+        flow.addEdge(1, 3, 1, 0)
+        flow.addEdge(2, 3, 1, 0)
+        self.assertEqual(flow.solve(0, 3), (2, -6))
+        self.assertEqual(flow.getFlow(cheap), 1)
+        self.assertEqual(flow.getFlow(expensive), 1)
+
+    def test_stops_at_nonnegative_cost(self):
+        flow = MinCostFlow(3)
+        flow.addEdge(0, 1, 2, -3)
+        flow.addEdge(1, 2, 1, 0)
+        flow.addEdge(0, 2, 1, 4)
+        self.assertEqual(flow.solve(0, 2), (1, -3))
+
+
+class FlowDivisionTest(unittest.TestCase):
+
+    def test_feasible(self):
+        for seed in range(3):
+            division = createDivision(seed=seed)
+            FlowDivision(division.workshops, division.participants).run()
+            checkFeasible(self, division)
+
+    def test_feasible_with_scarce_places(self):
+        division = createDivision(num_participants=300, num_workshops=12,
+                                  ratings=3, seed=7)
+        FlowDivision(division.workshops, division.participants).run()
+        checkFeasible(self, division)
+
+    def test_engine_not_worse_than_incremental(self):
+        division = createDivision(seed=1)
+        division.startDivision("incremental", fallback=False)
+        incremental = getTotalPoints(division)
+        for p in division.participants:
+            p.clearAssignment()
+        division.startDivision("flow", fallback=False)
+        checkFeasible(self, division)
+        self.assertGreaterEqual(getTotalPoints(division), incremental)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from incrementaldivision import IncrementalDivision
+from tests.common import createDivision, getAssignment, checkFeasible
+
+
+class IncrementalDivisionTest(unittest.TestCase):
+
+    def divideBoth(self, seed, **kwargs):
+        """Divide the same instance with the greedy loop and the
+        incremental engine and return both assignments"""
+        division = createDivision(seed=seed, **kwargs)
+        division.startDivision("greedy", fallback=False)
+        checkFeasible(self, division)
+        greedy = getAssignment(division)
+
+        # the same objects keep the iteration order of the dicts
+        for p in division.participants:
+            p.clearAssignment()
+        division.startDivision("incremental", fallback=False)
+        checkFeasible(self, division)
+        return greedy, getAssignment(division)
+
+    def test_same_assignment_as_greedy(self):
+        for seed in range(3):
+            greedy, incremental = self.divideBoth(seed)
+            self.assertEqual(greedy, incremental)
+
+    def test_same_assignment_with_scarce_places(self):
+        greedy, incremental = self.divideBoth(7, num_participants=300,
+                                              num_workshops=12, ratings=3)
+        self.assertEqual(greedy, incremental)
+
+    def test_returns_remaining(self):
+        division = createDivision(num_participants=100, num_workshops=4,
+                                  ratings=2)
+        remaining = IncrementalDivision(division.workshops,
+                                        division.participants).run()
+        self.assertEqual(remaining, [p for p in division.participants
+                                     if not p.isFullyAssigned()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import threading
+import unittest
+
+from participant import Participant
+from workshop import Workshop
+from tests.common import createDivision
+
+
+def divide(seed, summaries, index, barrier=None):
+    division = createDivision(num_participants=80, num_workshops=10,
+                              seed=seed)
+    division.startInstrumentation()
+    if barrier is not None:
+        # both threads run while both instrumentations are started
+        barrier.wait()
+    division.startDivision("greedy")
+    summaries[index] = division.stopInstrumentation()
+
+
+class Barrier(object):
+    """Wait until count threads arrived"""
+
+    def __init__(self, count):
+        self.count = count
+        self.condition = threading.Condition()
+
+    def wait(self):
+        with self.condition:
+            self.count -= 1
+            self.condition.notify_all()
+            while self.count > 0:
+                self.condition.wait()
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.methods = [Participant.__dict__["getPoints"],
+                        Participant.__dict__["assignWorkshop"],
+                        Workshop.__dict__["hasFreeSlots"]]
+
+    def assertRestored(self):
+        self.assertEqual([Participant.__dict__["getPoints"],
+                          Participant.__dict__["assignWorkshop"],
+                          Workshop.__dict__["hasFreeSlots"]], self.methods)
+
+    def test_counts_calls(self):
+        summaries = [None]
+        divide(0, summaries, 0)
+        self.assertRestored()
+        calls = summaries[0]['calls']
+        self.assertGreater(calls['getPoints'], 0)
+        self.assertGreater(calls['assignWorkshop'], 0)
+        self.assertLessEqual(sum(i['assignments']
+                                 for i in summaries[0]['iterations']),
+                             calls['assignWorkshop'])
+        self.assertIn('division', summaries[0]['phases'])
+
+    def test_concurrent_runs(self):
+        expected = [None, None]
+        divide(1, expected, 0)
+        divide(2, expected, 1)
+
+        summaries = [None, None]
+        barrier = Barrier(2)
+        threads = [threading.Thread(target=divide,
+                                    args=(seed, summaries, i, barrier))
+                   for i, seed in enumerate([1, 2])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertRestored()
+        for summary, alone in zip(summaries, expected):
+            self.assertEqual(summary['calls'], alone['calls'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from workshopdivision import WorkshopDivision
+import tests.common  # noqa: F401
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "benchmarks"))
+
+from generate import writeInstance  # noqa: E402
+
+
+class LoadingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.files = writeInstance(self.directory, participants=300,
+                                   workshops=12)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def load(self):
+        division = WorkshopDivision(configure_logging=False)
+        division.loadWorkshops(self.files[0], "excel")
+        division.loadParticipants(self.files[1], "excel")
+        return division
+
+    def test_loads_all_rows(self):
+        division = self.load()
+        self.assertEqual(len(division.workshops), 12)
+        self.assertEqual(len(division.participants), 300)
+        for p in division.participants:
+            self.assertIn(p.age, [u"GuSp", u"CaEx"])
+            self.assertTrue(p.trupp)
+
+
+if __name__ == '__main__':
+    unittest.main()
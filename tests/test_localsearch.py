@@ -0,0 +1,61 @@
+import unittest
+
+from tests.common import createDivision, getTotalPoints, checkFeasible
+
+
+class LocalSearchTest(unittest.TestCase):
+
+    def test_improves_and_stays_feasible(self):
+        for seed in range(3):
+            division = createDivision(num_participants=150, seed=seed)
+            division.startDivision("incremental")
+            before = getTotalPoints(division)
+            report = division.improveDivision(time_limit=None,
+                                              max_iterations=5000, seed=seed)
+            checkFeasible(self, division)
+            after = getTotalPoints(division)
+            self.assertGreaterEqual(after, before)
+            self.assertEqual(report['iterations'], 5000)
+            self.assertAlmostEqual(report['initial_points'], before)
+            self.assertAlmostEqual(report['points'], after)
+
+    def test_keeps_fully_assigned(self):
+        division = createDivision(num_participants=150, seed=5)
+        division.startDivision("incremental")
+        full = set(p for p in division.participants if p.isFullyAssigned())
+        division.improveDivision(time_limit=None, max_iterations=5000)
+        self.assertEqual(full, set(p for p in division.participants
+                                   if p.isFullyAssigned()))
+
+    def test_anytime_progress(self):
+        division = createDivision(num_participants=150, seed=6)
+        statuses = []
+
+        def progress(status):
+            self.assertAlmostEqual(status['points'],
+                                   getTotalPoints(division))
+            self.assertEqual(status['unassigned'], len(
+                [p for p in division.participants
+                 if not p.isFullyAssigned()]))
+            statuses.append(status)
+
+        last = division.startAnytimeDivision(0.3, progress,
+                                             progress_interval=0.0)
+        phases = [status['phase'] for status in statuses]
+        self.assertEqual(phases[0], "division")
+        self.assertIn("improve", phases)
+        self.assertEqual(statuses[-1], last)
+        self.assertEqual(last['phase'], "done")
+        points = [status['points'] for status in statuses]
+        for before, after in zip(points, points[1:]):
+            self.assertGreater(after, before - 1e-6)
+
+    def test_empty_division(self):
+        division = createDivision(num_participants=0)
+        report = division.improveDivision(time_limit=None, max_iterations=10)
+        self.assertEqual(report['iterations'], 0)
+        self.assertEqual(report['gain'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from multistart import scoreDivision, rankScore, runSeededDivision, initWorker
+from tests.common import createDivision, getAssignment, checkFeasible
+
+
+class MultistartTest(unittest.TestCase):
+
+    def test_deterministic(self):
+        results = []
+        for _ in range(2):
+            division = createDivision(seed=3)
+            best = division.startMultiDivision(runs=4, seed=10, processes=1)
+            checkFeasible(self, division)
+            self.assertEqual(scoreDivision(division.participants), best[1])
+            results.append((best, getAssignment(division)))
+        self.assertEqual(results[0], results[1])
+
+    def test_keeps_best_seed(self):
+        division = createDivision(seed=3)
+        initWorker(division.getInstanceData())
+        scores = [runSeededDivision((seed, "incremental"))[:2]
+                  for seed in range(10, 14)]
+        expected = min(scores, key=lambda r: (rankScore(r[1]), r[0]))
+
+        best_seed, best_score = division.startMultiDivision(
+            runs=4, seed=10, processes=1)
+        self.assertEqual((best_seed, best_score), expected)
+        self.assertEqual(scoreDivision(division.participants), best_score)
+
+    def test_same_seed_same_assignment(self):
+        division = createDivision(seed=5)
+        initWorker(division.getInstanceData())
+        first = runSeededDivision((10, "incremental"))
+        # other divisions alive change the addresses of the new workshops
+        kept = []
+        for engine in ["incremental", "greedy"] * 3:
+            kept.append(createDivision(num_participants=20, seed=6))
+            self.assertEqual(runSeededDivision((10, engine)), first)
+
+    def test_pool_same_as_serial(self):
+        serial = createDivision(num_participants=100, seed=4)
+        parallel = createDivision(num_participants=100, seed=4)
+        self.assertEqual(serial.startMultiDivision(runs=2, processes=1),
+                         parallel.startMultiDivision(runs=2, processes=2))
+        self.assertEqual(getAssignment(serial), getAssignment(parallel))
+        checkFeasible(self, parallel)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import logging
+import unittest
+
+from participant import Participant
+from workshop import Workshop
+import tests.common  # noqa: F401
+
+DATES = [u"Sa", u"Mi"]
+
+
+class ParticipantTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workshops = [Workshop(u"Workshop %d" % i, u"Chef", [u"GuSp"],
+                                   DATES, 5, i) for i in range(3)]
+
+    def test_points_keep_double_precision(self):
+        p = Participant(u"Name", u"GuSp", u"Trupp", [1, 2, 4], DATES)
+        sum_points = 7 / float(100)
+        self.assertEqual([p.getPoints(w) for w in self.workshops],
+                         [1 / sum_points, 2 / sum_points, 4 / sum_points])
+        self.assertEqual(sum(p.getPoints(w) for w in self.workshops), 100.0)
+
+    def test_points_of_dict(self):
+        p = Participant(u"Name", u"GuSp", u"Trupp",
+                        {self.workshops[2]: 5.5}, DATES, normalize=False)
+        self.assertEqual(p.getPoints(self.workshops[2]), 5.5)
+        self.assertEqual(p.getPoints(self.workshops[0]), 0.0)
+
+    def test_fully_assigned_logs_lazily(self):
+        p = Participant(u"Name", u"GuSp", u"Trupp", [1, 1, 1], DATES)
+        for w, d in zip(self.workshops, DATES):
+            p.assignWorkshop(w, d)
+
+        calls = []
+        workshops = Participant.workshops
+
+        def counted(self):
+            calls.append(self)
+            return workshops.fget(self)
+        Participant.workshops = property(counted)
+        logger = logging.getLogger("workshopdivision")
+        level = logger.level
+        try:
+            logger.setLevel(logging.INFO)
+            self.assertTrue(p.isFullyAssigned())
+            self.assertEqual(calls, [])
+            logger.setLevel(logging.DEBUG)
+            self.assertTrue(p.isFullyAssigned())
+            self.assertEqual(calls, [p])
+        finally:
+            logger.setLevel(level)
+            Participant.workshops = workshops
+
+    def test_can_take(self):
+        p = Participant(u"Name", u"GuSp", u"Trupp", [1, 1, 1], DATES)
+        first, second = self.workshops[:2]
+        p.assignWorkshop(first, u"Sa")
+        # the workshop it has on the day may be replaced
+        self.assertTrue(p.canTake(first, u"Sa"))
+        self.assertFalse(p.canTake(first, u"Mi"))
+        self.assertTrue(p.canTake(second, u"Mi"))
+        other = Workshop(u"Other", u"Chef", [u"CaEx"], [u"Mi"], 5, 3)
+        self.assertFalse(p.canTake(other, u"Mi"))
+        saturday = Workshop(u"Saturday", u"Chef", [u"GuSp"], [u"Sa"], 5, 4)
+        self.assertFalse(p.canTake(saturday, u"Mi"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import preferencematrix
+from tests.common import createDivision
+
+STATISTICS = ["getSumPointsPerWorkshop", "getMaxPointsPerWorkshops",
+              "getMedianPointsPerWorkshop", "getMeanPointsPerWorkshop"]
+
+
+@unittest.skipUnless(preferencematrix.isSupported(), "numpy is missing")
+class PreferenceMatrixTest(unittest.TestCase):
+
+    def assertSameStatistics(self, division, remaining):
+        for name in STATISTICS:
+            division.useMatrixBackend(False)
+            expected = getattr(division, name)(remaining)
+            division.useMatrixBackend(True)
+            actual = getattr(division, name)(remaining)
+            self.assertEqual(sorted(expected), sorted(actual), name)
+            for w in expected:
+                self.assertAlmostEqual(expected[w], actual[w], places=3,
+                                       msg="%s of %s" % (name, w))
+
+    def test_statistics_match_python(self):
+        division = createDivision(num_participants=150, num_workshops=12)
+        self.assertSameStatistics(division, division.participants)
+        division.startDivision("incremental", fallback=False)
+        remaining = [p for p in division.participants
+                     if not p.isFullyAssigned()]
+        self.assertSameStatistics(division, remaining)
+        self.assertSameStatistics(division, [])
+
+    def test_reordered_participants_rebuild_the_matrix(self):
+        division = createDivision(num_participants=80, num_workshops=8)
+        division.useMatrixBackend(True)
+        division.getPreferenceMatrix()
+        reference = division.getSortedParticipants()
+        data = division.getAssignmentData(reference)
+        order = list(reversed(data[0]))
+        division.loadAssignmentData((order, data[1]), reference)
+        self.assertIsNone(division.matrix)
+        matrix = division.getPreferenceMatrix()
+        self.assertEqual([matrix.rows[p] for p in division.participants],
+                         range(len(division.participants)))
+        self.assertSameStatistics(division, division.participants)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import queuedlogging
+import tests.common  # noqa: F401
+
+logger = logging.getLogger("workshopdivision")
+
+
+class RunLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "run.log")
+        self.handlers = logger.handlers[:]
+        self.level = logger.level
+        logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        queuedlogging.stopQueuedLogging()
+        logger.setLevel(self.level)
+        self.assertEqual(logger.handlers, self.handlers)
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        with open(self.filename) as f:
+            return f.read()
+
+    def assertStopped(self, handler):
+        logger.info("after the run")
+        queuedlogging.flushQueuedLogging()
+        self.assertIn("during the run", self.read())
+        self.assertNotIn("after the run", self.read())
+        for h in getattr(handler, 'handlers', [handler]):
+            self.assertIsNone(h.stream)
+            self.assertNotIn(h, logger.handlers)
+
+    def test_direct(self):
+        handler = queuedlogging.startRunLog(self.filename)
+        logger.info("during the run")
+        queuedlogging.stopRunLog(handler)
+        self.assertStopped(handler)
+
+    def test_queued(self):
+        queuedlogging.startQueuedLogging()
+        handler = queuedlogging.startRunLog(self.filename)
+        logger.info("during the run")
+        queuedlogging.stopRunLog(handler)
+        queuedlogging.stopQueuedLogging()
+        self.assertStopped(handler)
+
+    def test_queue_stopped_first(self):
+        queuedlogging.startQueuedLogging()
+        handler = queuedlogging.startRunLog(self.filename)
+        logger.info("during the run")
+        queuedlogging.stopQueuedLogging()
+        queuedlogging.stopRunLog(handler)
+        self.assertStopped(handler)
+
+    def test_queue_started_later(self):
+        handler = queuedlogging.startRunLog(self.filename)
+        queuedlogging.startQueuedLogging()
+        logger.info("during the run")
+        queuedlogging.stopRunLog(handler)
+        self.assertStopped(handler)
+        queuedlogging.stopQueuedLogging()
+
+
+if __name__ == '__main__':
+    unittest.main()
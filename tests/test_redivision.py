@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from redivision import Redivision
+from workshopdivision import WorkshopDivision
+from tests.common import AGES, createDivision, getTotalPoints, checkFeasible
+
+
+class RedivisionTest(unittest.TestCase):
+
+    def createFull(self, settled_points, pending_points):
+        """Two workshops on Sa with one place, the first is full with the
+        settled participant"""
+        division = WorkshopDivision(configure_logging=False)
+        division.addWorkshop(u"Full", u"Chef", u"GuSp", "1", u"Sa")
+        division.addWorkshop(u"Free", u"Chef", u"GuSp", "1", u"Sa")
+        division.addParticipant(u"Settled", u"GuSp", u"Trupp",
+                                settled_points)
+        division.addParticipant(u"Pending", u"GuSp", u"Trupp",
+                                pending_points)
+        settled, pending = division.participants
+        settled.assignWorkshop(division.workshops[0], u"Sa")
+        return division, settled, pending
+
+    def test_repairs_with_gain(self):
+        division, settled, pending = self.createFull([1, 1], [1, 0])
+        moved = Redivision(division.workshops, [pending]).repair(pending,
+                                                                 u"Sa")
+        self.assertIs(moved, settled)
+        self.assertIs(settled.getWorkshop(u"Sa"), division.workshops[1])
+        self.assertIs(pending.getWorkshop(u"Sa"), division.workshops[0])
+
+    def test_no_repair_with_loss(self):
+        division, settled, pending = self.createFull([9, 1], [1, 1])
+        moved = Redivision(division.workshops, [pending]).repair(pending,
+                                                                 u"Sa")
+        self.assertIsNone(moved)
+        self.assertIs(settled.getWorkshop(u"Sa"), division.workshops[0])
+        self.assertIsNone(pending.getWorkshop(u"Sa"))
+
+    def test_update_keeps_points(self):
+        rng = random.Random(0)
+        division = createDivision(num_participants=250, seed=1)
+        division.startDivision("incremental", fallback=False)
+        before = getTotalPoints(division)
+
+        removed = rng.sample(division.participants, 10)
+        before -= sum(p.getPoints(w) for p in removed
+                      for w in p.workshops.itervalues() if w is not None)
+        for i in range(20):
+            points = [0] * len(division.workshops)
+            for k in rng.sample(range(len(points)), 5):
+                points[k] = rng.randint(1, 10)
+            division.addParticipant(u"Late %d" % i, rng.choice(AGES),
+                                    u"Trupp 0", points)
+
+        division.updateDivision(removed, fallback=False)
+        checkFeasible(self, division)
+        for p in removed:
+            self.assertNotIn(p, division.participants)
+        self.assertGreaterEqual(getTotalPoints(division), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from resultcache import ResultCache
+from workshopdivision import WorkshopDivision
+from tests.common import getAssignment
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "benchmarks"))
+
+from generate import writeInstance  # noqa: E402
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.directory, "cache")
+        self.files = writeInstance(self.directory, participants=150,
+                                   workshops=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def divide(self, seed, **options):
+        division = WorkshopDivision(configure_logging=False)
+        division.loadWorkshops(self.files[0], "excel")
+        division.loadParticipants(self.files[1], "excel")
+        if options.get('sparse'):
+            division.useSparseBackend()
+        restored = division.startCachedDivision("incremental", seed,
+                                                self.cache_dir)
+        return restored, getAssignment(division)
+
+    def divideFresh(self, seed):
+        """Divide without the cache in a new python process"""
+        script = (
+            "import json, sys\n"
+            "from workshopdivision import WorkshopDivision\n"
+            "from tests.common import getAssignment\n"
+            "division = WorkshopDivision(configure_logging=False)\n"
+            "division.loadWorkshops(sys.argv[1], 'excel')\n"
+            "division.loadParticipants(sys.argv[2], 'excel')\n"
+            "division.startSeededDivision('incremental', int(sys.argv[3]))\n"
+            "print json.dumps(sorted(getAssignment(division).items()))\n")
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir)
+        output = subprocess.check_output(
+            [sys.executable, "-c", script] + list(self.files) + [str(seed)],
+            cwd=root)
+        return {tuple(k): w for k, w in json.loads(output)}
+
+    def getCached(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return os.listdir(self.cache_dir)
+
+    def test_restores_seeded_division(self):
+        restored, divided = self.divide(3)
+        self.assertFalse(restored)
+        self.assertEqual(len(self.getCached()), 1)
+        restored, cached = self.divide(3)
+        self.assertTrue(restored)
+        self.assertEqual(cached, divided)
+
+    def test_restored_same_as_fresh_run(self):
+        self.divide(5)
+        restored, cached = self.divide(5)
+        self.assertTrue(restored)
+        self.assertEqual(cached, self.divideFresh(5))
+
+    def test_input_seed(self):
+        division = WorkshopDivision(configure_logging=False)
+        division.loadWorkshops(self.files[0], "excel")
+        division.loadParticipants(self.files[1], "excel")
+        seed = division.getInputSeed()
+        self.assertEqual(seed, division.getInputSeed())
+        self.assertFalse(division.startCachedDivision("incremental", seed,
+                                                      self.cache_dir))
+        self.assertTrue(self.divide(seed)[0])
+
+    def test_no_cache_without_seed(self):
+        self.assertFalse(self.divide(None)[0])
+        self.assertFalse(self.divide(None)[0])
+        self.assertEqual(self.getCached(), [])
+
+    def test_options_in_key(self):
+        self.divide(3)
+        self.assertFalse(self.divide(3, sparse=True)[0])
+        self.assertFalse(self.divide(4)[0])
+        self.assertEqual(len(self.getCached()), 3)
+
+    def test_evicts_least_recently_used(self):
+        cache = ResultCache(self.cache_dir, max_bytes=2500)
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.put(key, "x" * 1000)
+            # distinct modification times
+            os.utime(cache.getFilename(key), (i, i))
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+
+if __name__ == '__main__':
+    unittest.main()
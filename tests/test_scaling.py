@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+from StringIO import StringIO
+
+import tests.common  # noqa: F401
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                "benchmarks"))
+
+from scaling import PHASES, compare  # noqa: E402
+
+
+def createReport(**timings):
+    result = {'participants': 1000}
+    for phase in PHASES:
+        result[phase] = timings.get(phase, 1.0)
+    return {'results': [result]}
+
+
+class CompareTest(unittest.TestCase):
+
+    def compare(self, report, baseline, min_seconds=0.05, min_delta=0.02):
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            return compare(report, baseline, 0.2, min_seconds, min_delta)
+        finally:
+            sys.stdout = stdout
+
+    def test_no_regression(self):
+        self.assertEqual(self.compare(createReport(division=1.1),
+                                      createReport()), [])
+
+    def test_regression(self):
+        regressions = self.compare(createReport(division=1.5),
+                                   createReport())
+        self.assertEqual(regressions, [(1000, 'division', 1.5)])
+
+    def test_short_baseline_ignored(self):
+        self.assertEqual(self.compare(createReport(load=0.04),
+                                      createReport(load=0.01)), [])
+
+    def test_small_slowdown_ignored(self):
+        # 50% slower, but only by 30ms
+        self.assertEqual(self.compare(createReport(load=0.09),
+                                      createReport(load=0.06),
+                                      min_delta=0.05), [])
+
+    def test_unknown_size_ignored(self):
+        baseline = createReport()
+        baseline['results'][0]['participants'] = 2000
+        self.assertEqual(self.compare(createReport(load=5.0), baseline), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
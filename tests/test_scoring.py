@@ -0,0 +1,58 @@
+import unittest
+
+import scoring
+from multistart import scoreDivision
+from tests.common import createDivision
+
+if scoring.isSupported():
+    import numpy as np
+
+
+@unittest.skipUnless(scoring.isSupported(), "needs numpy")
+class BatchScorerTest(unittest.TestCase):
+
+    def createScored(self, seed):
+        division = createDivision(num_participants=150, seed=seed)
+        division.startDivision("incremental", fallback=False)
+        return division, division.getAssignmentArray()
+
+    def test_same_as_score_division(self):
+        division, assignment = self.createScored(0)
+        scores = division.scoreAssignments()
+        expected = scoreDivision(division.participants)
+        self.assertAlmostEqual(scores['points'], expected['points'])
+        self.assertEqual(scores['unassigned'], expected['unassigned'])
+        self.assertAlmostEqual(scores['participant_points'].min(),
+                               expected['min_points'])
+        self.assertEqual(scores['overfull'], 0)
+        for w in division.workshops:
+            places = w.max_participants_per_day * len(w.days)
+            if places:
+                self.assertAlmostEqual(
+                    scores['fill_rates'][w.id],
+                    float(sum(w.num_participants.values())) / places)
+
+    def test_batch_same_as_single(self):
+        division, assignment = self.createScored(1)
+        other = assignment.copy()
+        other[:, 0] = scoring.FREE
+        crowded = np.zeros_like(assignment)
+        batch = division.scoreAssignments(np.array([assignment, other,
+                                                    crowded]))
+        for i, single in enumerate([assignment, other, crowded]):
+            score = division.scoreAssignments(single)
+            for key in score:
+                self.assertTrue(np.allclose(batch[key][i], score[key]), key)
+        self.assertEqual(batch['unassigned'][1], 150)
+        self.assertGreater(batch['overfull'][2], 0)
+
+    def test_lowest_decile(self):
+        division, assignment = self.createScored(2)
+        scores = division.scoreAssignments(assignment)
+        points = sorted(scores['participant_points'])
+        self.assertAlmostEqual(scores['lowest_decile'],
+                               sum(points[:15]) / 15.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from sharding import findComponents, splitCapacity, getShards
+from workshopdivision import WorkshopDivision
+from tests.common import createDivision, getAssignment, checkFeasible
+
+
+class SplitCapacityTest(unittest.TestCase):
+
+    def test_proportional(self):
+        self.assertEqual(splitCapacity(10, [3, 1, 1]), [6, 2, 2])
+        self.assertEqual(splitCapacity(10, [1, 1, 1]), [4, 3, 3])
+
+    def test_keeps_capacity(self):
+        for capacity in range(12):
+            for demands in [[0.5, 2.5], [1, 2, 3, 4], [7]]:
+                self.assertEqual(sum(splitCapacity(capacity, demands)),
+                                 capacity)
+
+    def test_no_demand(self):
+        self.assertEqual(splitCapacity(4, [0, 0]), [2, 2])
+
+
+class ShardingTest(unittest.TestCase):
+
+    def createSeparated(self):
+        """A camp where every workshop is for a single age"""
+        division = WorkshopDivision(configure_logging=False)
+        for i in range(6):
+            division.addWorkshop(u"Workshop %d" % i, u"Chef", [u"GuSp",
+                                 u"CaEx"][i % 2], "4", u"Sa, Mi")
+        for i in range(20):
+            points = [(i + k) % 5 + 1 for k in range(6)]
+            division.addParticipant(u"Participant %d" % i,
+                                    [u"GuSp", u"CaEx"][i % 2], u"Trupp",
+                                    points)
+        return division
+
+    def test_separated_components(self):
+        division = self.createSeparated()
+        components = findComponents(division.workshops,
+                                    division.available_ages)
+        self.assertEqual(len(components), 2)
+        for ages, workshops in components:
+            self.assertEqual(len(ages), 1)
+            self.assertEqual(len(workshops), 3)
+            for w in workshops:
+                self.assertEqual(w.ages, ages)
+
+    def test_shared_workshop_joins(self):
+        division = self.createSeparated()
+        division.addWorkshop(u"Shared", u"Chef", u"GuSp, CaEx", "4", u"Sa")
+        components = findComponents(division.workshops,
+                                    division.available_ages)
+        self.assertEqual(len(components), 1)
+        self.assertEqual(len(components[0][1]), 7)
+
+    def test_split_shards_keep_capacity(self):
+        division = createDivision(seed=2)
+        shards = getShards(division)
+        self.assertEqual(sorted(p.name for ages, participants, workshops
+                                in shards for p in participants),
+                         sorted(p.name for p in division.participants))
+        capacity = {}
+        for ages, participants, workshops in shards:
+            for w, c in workshops:
+                capacity[w] = capacity.get(w, 0) + c
+        self.assertEqual(capacity, {w: w.max_participants_per_day
+                                    for w in division.workshops})
+
+    def test_division_feasible(self):
+        for split in [True, False]:
+            division = createDivision(seed=3)
+            division.startShardedDivision(processes=1, split=split)
+            checkFeasible(self, division)
+
+    def test_pool_same_as_serial(self):
+        serial = createDivision(num_participants=100, seed=4)
+        serial.startShardedDivision(processes=1)
+        parallel = createDivision(num_participants=100, seed=4)
+        parallel.startShardedDivision(processes=2)
+        checkFeasible(self, parallel)
+        self.assertEqual(getAssignment(serial), getAssignment(parallel))
+
+
+if __name__ == '__main__':
+    unittest.main()
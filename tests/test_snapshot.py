@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import preferencematrix
+import snapshot
+from tests.common import createDivision, getAssignment
+from workshopdivision import WorkshopDivision
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "snapshot.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_roundtrip(self):
+        division = createDivision(seed=5)
+        division.startDivision("incremental")
+        division.saveSnapshot(self.filename)
+
+        loaded = WorkshopDivision(configure_logging=False)
+        self.assertTrue(loaded.loadSnapshot(self.filename))
+        self.assertEqual(loaded.getInstanceData(), division.getInstanceData())
+        self.assertEqual(getAssignment(loaded), getAssignment(division))
+
+    def test_outdated(self):
+        source = os.path.join(self.directory, "source.csv")
+        with open(source, 'w') as f:
+            f.write("a")
+        division = createDivision(num_participants=20)
+        division.sources = [source]
+        division.saveSnapshot(self.filename)
+        with open(source, 'w') as f:
+            f.write("b")
+        loaded = WorkshopDivision(configure_logging=False)
+        self.assertFalse(loaded.loadSnapshot(self.filename, [source]))
+
+    def test_not_a_snapshot(self):
+        with open(self.filename, 'w') as f:
+            f.write("Nr;Name\n")
+        self.assertIsNone(snapshot.readSnapshot(self.filename))
+
+    @unittest.skipUnless(preferencematrix.isSupported(), "needs numpy")
+    def test_matrix_from_memory_map(self):
+        division = createDivision(seed=6)
+        division.saveSnapshot(self.filename)
+        hashes, data, assignment, matrix = snapshot.readSnapshot(
+            self.filename)
+        self.assertEqual(matrix.shape, (200, 20))
+        self.assertEqual(matrix.tolist(), [list(points) for name, age,
+                                           trupp, points in data[3]])
+
+        loaded = WorkshopDivision(configure_logging=False)
+        loaded.loadSnapshot(self.filename)
+        loaded.useMatrixBackend()
+        # the rows follow the participants when they are reordered
+        loaded.participants.reverse()
+        loaded.clearPreferences()
+        points = loaded.getPreferenceMatrix().points
+        for i, p in enumerate(loaded.participants):
+            for w in loaded.workshops:
+                self.assertAlmostEqual(points[i, w.id], p.getPoints(w),
+                                       places=4)
+
+        loaded.addParticipant(u"Late", u"GuSp", u"Trupp", [1] * 20)
+        self.assertIsNone(loaded.snapshot_points)
+        self.assertEqual(loaded.getPreferenceMatrix().points.shape,
+                         (201, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
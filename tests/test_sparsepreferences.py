@@ -0,0 +1,82 @@
+import unittest
+
+from tests.common import createDivision, getAssignment
+
+
+class SparsePreferencesTest(unittest.TestCase):
+
+    def getStatistics(self, division, remaining):
+        return [division.getSumPointsPerWorkshop(remaining),
+                division.getMaxPointsPerWorkshops(remaining),
+                division.getMedianPointsPerWorkshop(remaining),
+                division.getMeanPointsPerWorkshop(remaining)]
+
+    def assertSameStatistics(self, division, remaining):
+        dense = self.getStatistics(division, remaining)
+        division.useSparseBackend()
+        sparse = self.getStatistics(division, remaining)
+        division.useSparseBackend(False)
+        for expected, values in zip(dense, sparse):
+            self.assertEqual(sorted(expected), sorted(values))
+            for w in expected:
+                self.assertAlmostEqual(expected[w], values[w])
+
+    def test_statistics(self):
+        division = createDivision(seed=9)
+        self.assertSameStatistics(division, None)
+        self.assertSameStatistics(division, division.participants[:50])
+        self.assertSameStatistics(division, [])
+
+    def test_statistics_after_assignments(self):
+        division = createDivision(seed=10)
+        division.startDivision("incremental", fallback=False)
+        remaining = [p for p in division.participants
+                     if not p.isFullyAssigned()]
+        self.assertSameStatistics(division, None)
+        self.assertSameStatistics(division, remaining)
+
+    def test_participant_with_max_points(self):
+        division = createDivision(seed=11)
+        division.participants[0].assignWorkshop(division.workshops[0])
+        remaining = division.participants[::2]
+        for w in division.workshops:
+            dense = division.getParticipantWithMaxPoints(w, remaining)
+            division.useSparseBackend()
+            sparse = division.getParticipantWithMaxPoints(w, remaining)
+            division.useSparseBackend(False)
+            if dense is None:
+                self.assertIsNone(sparse)
+            else:
+                self.assertEqual(sparse.getPoints(w), dense.getPoints(w))
+                self.assertTrue(sparse.isAvailable(w))
+
+    def test_same_greedy_division(self):
+        division = createDivision(num_participants=120, seed=12)
+        division.startDivision("greedy", fallback=False)
+        dense = getAssignment(division)
+        for p in division.participants:
+            p.clearAssignment()
+        division.useSparseBackend()
+        division.startDivision("greedy", fallback=False)
+        self.assertEqual(getAssignment(division), dense)
+
+    def test_greedy_builds_remaining_once(self):
+        division = createDivision(num_participants=60, seed=13)
+        division.useSparseBackend()
+        calls = []
+        lookup = division.getParticipantWithMaxPoints
+
+        def recorded(w, remaining=None):
+            calls.append(remaining)
+            return lookup(w, remaining)
+        division.getParticipantWithMaxPoints = recorded
+        division.startDivision("greedy", fallback=False)
+        self.assertTrue(calls)
+        for remaining in calls:
+            self.assertIsInstance(remaining, set)
+        # one set per iteration, shared by the workshops tried in it
+        self.assertLess(len(set(map(id, calls))), len(calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import whatif
+from tests.common import createDivision
+
+
+class ParseScenarioTest(unittest.TestCase):
+
+    def test_modifications(self):
+        self.assertEqual(
+            whatif.parseScenario(u"capacity:Klettern=20; drop:Kochen;"
+                                 u"days:Erste Hilfe=Mi;"),
+            [("capacity", u"Klettern", 20), ("drop", u"Kochen"),
+             ("days", u"Erste Hilfe", u"Mi")])
+        self.assertEqual(whatif.parseScenario(u""), [])
+
+    def test_invalid(self):
+        for spec in [u"capacity:Klettern=viele", u"drop:", u"drop:A=1",
+                     u"days:A", u"close:A"]:
+            self.assertIsNone(whatif.parseScenario(spec), spec)
+
+
+class ApplyModificationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = createDivision(num_participants=20, num_workshops=3,
+                                   ratings=2).getInstanceData()
+        self.names = [w[0] for w in self.data[2]]
+
+    def test_modify_copy(self):
+        modified = whatif.applyModifications(self.data, [
+            ("capacity", self.names[0], 99), ("drop", self.names[1]),
+            ("days", self.names[2], u"Mi")])
+        dates, ages, workshops, participants = modified
+        self.assertEqual(workshops[0][4], 99)
+        self.assertEqual(workshops[1][4], 0)
+        self.assertEqual(workshops[2][3], [u"Mi"])
+        # dropped workshops keep their column
+        self.assertEqual(len(workshops), 3)
+        self.assertIs(participants, self.data[3])
+        self.assertNotEqual(self.data[2][0][4], 99)
+
+    def test_unknown(self):
+        self.assertIsNone(whatif.applyModifications(
+            self.data, [("drop", u"Unknown")]))
+        self.assertIsNone(whatif.applyModifications(
+            self.data, [("days", self.names[0], u"Fr")]))
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_sweep(self):
+        division = createDivision(num_participants=100, num_workshops=8,
+                                  ratings=3, seed=13)
+        name = division.workshops[0].name
+        results = division.startSweep(
+            [(u"more", [("capacity", name, 100)]),
+             (u"drop", [("drop", name)])], seed=1, processes=1)
+        self.assertEqual([label for label, score in results],
+                         [whatif.BASELINE, u"more", u"drop"])
+        baseline, more, drop = [score for label, score in results]
+        self.assertGreater(more['places'], baseline['places'])
+        self.assertLess(drop['places'], baseline['places'])
+        self.assertEqual(drop['fill_rates'].get(name), None)
+        self.assertIn(whatif.BASELINE, whatif.formatTable(results, True))
+
+        # the division itself is not modified
+        self.assertNotEqual(division.workshops[0].max_participants_per_day,
+                            100)
+        self.assertEqual([label for label, score in division.startSweep(
+            [], seed=1, processes=1)], [whatif.BASELINE])
+
+    def test_invalid_scenario(self):
+        division = createDivision(num_participants=20, num_workshops=3,
+                                  ratings=2)
+        self.assertIsNone(division.startSweep(
+            [(u"bad", [("drop", u"Unknown")])], processes=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
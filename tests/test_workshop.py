@@ -0,0 +1,62 @@
+import unittest
+
+from participant import Participant
+from workshop import Workshop
+import tests.common  # noqa: F401
+
+DATES = [u"Sa", u"Mi"]
+
+
+class WorkshopOccupancyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workshop = Workshop(u"Klettern", u"Chef", [u"GuSp"], DATES, 2,
+                                 id=0)
+        self.participants = [
+            Participant(u"P%d" % i, u"GuSp", u"T", [1.0], DATES)
+            for i in range(4)]
+
+    def test_counts_follow_assignments(self):
+        w = self.workshop
+        w.assignParticipant(u"Sa", self.participants[0])
+        w.assignParticipant(u"Sa", self.participants[1])
+        self.assertEqual(w.num_participants[u"Sa"], 2)
+        self.assertFalse(w.hasFreeSlots(u"Sa"))
+        self.assertTrue(w.hasFreeSlots(u"Mi"))
+        self.assertEqual(list(w.getParticipantsOfDay(u"Sa")),
+                         self.participants[:2])
+
+        w.removeParticipant(u"Sa", self.participants[0])
+        self.assertEqual(w.num_participants[u"Sa"], 1)
+        self.assertTrue(w.hasFreeSlots(u"Sa"))
+        self.assertEqual(list(w.getParticipantsOfDay(u"Sa")),
+                         self.participants[1:2])
+
+    def test_rejects_duplicates_and_unknown_days(self):
+        w = self.workshop
+        w.assignParticipant(u"Sa", self.participants[0])
+        w.assignParticipant(u"Sa", self.participants[0])
+        w.assignParticipant(u"Mo", self.participants[1])
+        self.assertEqual(w.num_participants, {u"Sa": 1, u"Mi": 0})
+        # removing a participant that is not there changes nothing
+        w.removeParticipant(u"Mi", self.participants[0])
+        self.assertEqual(w.num_participants, {u"Sa": 1, u"Mi": 0})
+
+    def test_min_day_and_num_participants(self):
+        w = self.workshop
+        w.assignParticipant(u"Sa", self.participants[0])
+        self.assertEqual(w.getMinDay(), u"Mi")
+        self.assertEqual(w.getMinDay([u"Sa"]), u"Sa")
+        self.assertIsNone(w.getMinDay([u"Mo"]))
+        self.assertEqual(w.getNumParticipants(), 0)
+        w.assignParticipant(u"Mi", self.participants[1])
+        self.assertEqual(w.getNumParticipants(), 1)
+
+    def test_workshop_without_places_has_no_free_slots(self):
+        w = Workshop(u"Leer", u"Chef", [u"GuSp"], DATES, 0, id=1)
+        self.assertFalse(w.hasFreeSlots(u"Sa"))
+        self.assertFalse(w.hasFreeSlots(u"Mi"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+"""Compare capacity scenarios of the loaded workshops before confirming them.
+
+A scenario is a list of modifications of the workshops:
+
+    ("capacity", name, participants_per_day)
+    ("drop", name)
+    ("days", name, days)
+
+On the command line a scenario is written as modifications separated by
+";", like "capacity:Klettern=20;drop:Kochen;days:Erste Hilfe=Mi". Every
+scenario is divided in a process pool from the same parsed instance, so
+the csv files are read once and the normalized points are reused. A
+dropped workshop keeps its column with no places, so the points of the
+other workshops stay comparable between the scenarios."""
+import argparse
+import logging
+import multiprocessing
+import random
+
+from multistart import scoreDivision
+
+logger = logging.getLogger("workshopdivision")
+
+BASELINE = "baseline"
+
+# the instance data of the worker processes
+_instance = None
+
+
+def parseScenario(spec):
+    """Parse the modifications of a scenario from the command line or
+    return None"""
+    modifications = []
+    for part in spec.split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        kind, _, rest = part.partition(":")
+        name, _, value = rest.partition("=")
+        if kind == "drop" and name and not value:
+            modifications.append(("drop", name))
+        elif kind == "capacity" and name and value.isdigit():
+            modifications.append(("capacity", name, int(value)))
+        elif kind == "days" and name and value:
+            modifications.append(("days", name, value))
+        else:
+            logger.error("Invalid modification %s", part)
+            return None
+    return modifications
+
+
+def applyModifications(data, modifications):
+    """Get a copy of the instance data with modified workshops or None if
+    a workshop is unknown"""
+    dates, ages, workshops, participants = data
+    workshops = [list(w) for w in workshops]
+    index = {}
+    for i, w in enumerate(workshops):
+        index.setdefault(w[0], i)
+
+    for modification in modifications:
+        kind, name = modification[:2]
+        if name not in index:
+            logger.error("Unknown workshop %s in scenario", name)
+            return None
+        workshop = workshops[index[name]]
+        if kind == "drop":
+            workshop[4] = 0
+        elif kind == "capacity":
+            workshop[4] = modification[2]
+        elif kind == "days":
+            days = [d for d in dates if d in modification[2]]
+            if not days:
+                logger.error("No days in %s for %s", modification[2], name)
+                return None
+            workshop[3] = days
+    return dates, ages, [tuple(w) for w in workshops], participants
+
+
+def initWorker(data):
+    global _instance
+    _instance = data
+
+
+def runScenario(args):
+    """Divide the instance with the modifications of the scenario"""
+    # imported here to avoid the circular import with workshopdivision
+    from workshopdivision import WorkshopDivision
+
+    label, modifications, engine, seed = args
+    division = WorkshopDivision(configure_logging=False)
+    division.loadInstanceData(applyModifications(_instance, modifications))
+    random.Random(seed).shuffle(division.participants)
+    division.startDivision(engine)
+
+    score = scoreDivision(division.participants)
+    places = 0
+    assigned = 0
+    score['fill_rates'] = {}
+    for w in division.workshops:
+        workshop_places = w.max_participants_per_day * len(w.days)
+        workshop_assigned = sum(w.num_participants.values())
+        places += workshop_places
+        assigned += workshop_assigned
+        if workshop_places:
+            score['fill_rates'][w.name] = \
+                float(workshop_assigned) / workshop_places
+    score['places'] = places
+    score['fill_rate'] = float(assigned) / places if places else 0.0
+    return label, score
+
+
+def startSweep(division, scenarios, engine, seed, processes):
+    """Divide every scenario in parallel.
+
+    scenarios is a list of (label, modifications), the unmodified
+    workshops are added first as BASELINE. Returns a list of (label,
+    score) in the same order or None if a scenario is invalid."""
+    data = division.getInstanceData()
+    for label, modifications in scenarios:
+        if applyModifications(data, modifications) is None:
+            logger.error("Can't apply scenario %s", label)
+            return None
+
+    tasks = [(label, modifications, engine, seed) for label, modifications
+             in [(BASELINE, [])] + list(scenarios)]
+    if processes == 1:
+        initWorker(data)
+        results = [runScenario(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(processes, initWorker, (data,))
+        try:
+            results = pool.map(runScenario, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    for label, score in results:
+        logger.info("Scenario %s: %.1f points, %d unassigned, %.1f%% filled",
+                    label, score['points'], score['unassigned'],
+                    100 * score['fill_rate'])
+    return results
+
+
+def formatTable(results, fill_rates=False):
+    """Format the results of startSweep as a text table compared to the
+    baseline, with fill_rates also the fill rate of every workshop"""
+    baseline = results[0][1]
+    width = max(len(label) for label, score in results)
+    lines = ["%-*s %10s %9s %10s %7s %6s" % (
+        width, "scenario", "points", "change", "unassigned", "places",
+        "fill")]
+    for label, score in results:
+        lines.append("%-*s %10.1f %+9.1f %10d %7d %5.1f%%" % (
+            width, label, score['points'],
+            score['points'] - baseline['points'], score['unassigned'],
+            score['places'], 100 * score['fill_rate']))
+
+    if fill_rates:
+        names = sorted(set().union(*[score['fill_rates']
+                                     for label, score in results]))
+        name_width = max([len(name) for name in names] + [8])
+        lines.append("")
+        lines.append("%-*s %s" % (name_width, "workshop", " ".join(
+            "%8s" % ("#%d" % i) for i in range(len(results)))))
+        for name in names:
+            rates = []
+            for label, score in results:
+                rate = score['fill_rates'].get(name)
+                rates.append("%7.1f%%" % (100 * rate) if rate is not None
+                             else "%8s" % "-")
+            lines.append("%-*s %s" % (name_width, name, " ".join(rates)))
+        lines.append("")
+        for i, (label, score) in enumerate(results):
+            lines.append("#%d %s" % (i, label))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the division of capacity scenarios")
+    parser.add_argument("scenarios", nargs="+", metavar="scenario",
+                        help="modifications like capacity:NAME=20;drop:NAME;"
+                        "days:NAME=Mi")
+    parser.add_argument("--workshops", default="Workshops.csv")
+    parser.add_argument("--participants", default="Anmeldung.csv")
+    parser.add_argument("--engine", default="incremental")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="shuffle the participants of all scenarios "
+                        "with this seed")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes, all cpus by default")
+    parser.add_argument("--fill-rates", action="store_true",
+                        help="also print the fill rate of every workshop")
+    args = parser.parse_args()
+
+    # imported here to avoid the circular import with workshopdivision
+    from workshopdivision import WorkshopDivision
+
+    scenarios = []
+    for spec in args.scenarios:
+        spec = spec.decode('utf-8')
+        modifications = parseScenario(spec)
+        if modifications is None:
+            parser.error("invalid scenario %s" % spec.encode('utf-8'))
+        scenarios.append((spec, modifications))
+
+    division = WorkshopDivision()
+    division.loadWorkshops(args.workshops)
+    division.loadParticipants(args.participants)
+    results = division.startSweep(scenarios, args.engine, args.seed,
+                                  args.processes)
+    if results is not None:
+        print(formatTable(results, args.fill_rates).encode('utf-8'))
+
+
+if __name__ == '__main__':
+    main()
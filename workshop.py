@@ -1,4 +1,5 @@
 import logging
+from collections import OrderedDict
 
 logger = logging.getLogger("workshopdivision")
 
@@ -7,16 +8,30 @@ class Workshop(object):
     """Workshop is a class to encapsulate the info of a workshop"""
     ID = 0
 
-    def __init__(self, name, supervisor, ages, days, max_participants_per_day):
+    def __init__(self, name, supervisor, ages, days, max_participants_per_day,
+                 id=None):
+        """id is the index of the workshop in its division, by default the
+        next number of the global counter"""
         super(Workshop, self).__init__()
         self.name = name
         self.days = days
+        self.day_set = frozenset(days)
         self.ages = ages
         self.supervisor = supervisor
         self.max_participants_per_day = max_participants_per_day
-        self.participants = {day: [] for day in self.days}
-        self.id = Workshop.ID
-        Workshop.ID += 1
+        # insertion ordered sets of the participants per day
+        self.participants = {day: OrderedDict() for day in self.days}
+        self.num_participants = {day: 0 for day in self.days}
+        self.free_days = set(self.days) if max_participants_per_day > 0 \
+            else set()
+        # participants that cache their availability for this workshop
+        self.subscribers = set()
+        # objects that follow every assignment, like the live statistics
+        self.listeners = []
+        if id is None:
+            id = Workshop.ID
+            Workshop.ID += 1
+        self.id = id
         logger.info("%s: %s", self, self.days)
 
     def maxParticipants(self):
@@ -38,8 +53,8 @@ class Workshop(object):
         min_part = 1000
         min_day = None
         for d in free_days:
-            if self.usesDay(d):
-                part = len(self.participants[d])
+            if d in self.day_set:
+                part = self.num_participants[d]
                 if part < min_part:
                     min_day = d
                     min_part = part
@@ -72,47 +87,65 @@ class Workshop(object):
         elif not participant.isAvailable(self):
             logger.warning("%s is not available for %s", self, participant)
         else:
-            self.participants[day].append(participant)
+            self.participants[day][participant] = None
+            self.num_participants[day] += 1
+            if self.num_participants[day] >= self.max_participants_per_day \
+                    and day in self.free_days:
+                self.free_days.discard(day)
+                self.publishFreeSlotsChanged(day)
+            for listener in self.listeners:
+                listener.participantAssigned(self, day, participant)
             logger.debug("Assigned %s for %s on %s", participant, self, day)
 
     def usesDay(self, day):
-        return day in self.days
+        return day in self.day_set
 
     def removeParticipant(self, day, participant):
         """Remove the participant from the given date"""
         if self.usesDay(day):
             if participant in self.participants[day]:
-                self.participants[day].remove(participant)
+                del self.participants[day][participant]
+                self.num_participants[day] -= 1
+                if self.num_participants[day] < self.max_participants_per_day \
+                        and day not in self.free_days:
+                    self.free_days.add(day)
+                    self.publishFreeSlotsChanged(day)
+                for listener in self.listeners:
+                    listener.participantRemoved(self, day, participant)
             else:
                 logger.warning("Can't remove %s from %s for %s (not there)",
                                participant, day, self)
         else:
             logger.warning("%s does not use day %s", self, day)
 
-    def hasFreeSlots(self, day):
-        if self.usesDay(day):
-            free_slots = len(self.participants[day])
+    def subscribe(self, participant):
+        """Notify the participant when a day fills up or gets free again"""
+        self.subscribers.add(participant)
 
-            isfree = free_slots < self.max_participants_per_day
+    def unsubscribe(self, participant):
+        self.subscribers.discard(participant)
 
-            if isfree:
-                logger.debug("%s has %d/%d on %s",
-                             self, free_slots, self.max_participants_per_day,
-                             day)
-            else:
-                logger.debug("%s has no free slots left (%d/%d) on %s",
-                             self, free_slots, self.max_participants_per_day,
-                             day)
-            return isfree
-        else:
-            logger.debug("%s does not use use day %s",
-                         self, day)
-            return False
+    def addListener(self, listener):
+        """Call participantAssigned(workshop, day, participant) and
+        participantRemoved(workshop, day, participant) of the listener"""
+        self.listeners.append(listener)
+
+    def removeListener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def publishFreeSlotsChanged(self, day):
+        logger.debug("%s changed its free slots on %s", self, day)
+        for p in self.subscribers:
+            p.invalidateAvailability(self)
+
+    def hasFreeSlots(self, day):
+        return day in self.free_days
 
     def getNumParticipants(self):
         min_num = 1000
         for day in self.days:
-            min_num = min(min_num, len(self.participants[day]))
+            min_num = min(min_num, self.num_participants[day])
 
         return min_num
 
@@ -3,20 +3,54 @@ import logging
 import logging.config
 import json
 import os
-from random import shuffle
+import time
+from random import Random, shuffle
 
 from workshop import Workshop
 from participant import Participant
+from incrementaldivision import IncrementalDivision
+import fallbackdivision
+from flowdivision import FlowDivision
+import multistart
+import whatif
+import resultcache
+import scoring
+import sharding
+import exporter
+import snapshot
+from localsearch import LocalSearch
+from redivision import Redivision
+import preferencematrix
+from divisionstatistics import DivisionStatistics
+import sparsepreferences
+import queuedlogging
+from instrumentation import Instrumentation, timedPhase
 
 logger = logging.getLogger("workshopdivision")
 
+# the engines of startDivision
+ENGINES = ("greedy", "incremental", "flow")
+
+# the logging is configured once per process
+_logging_configured = False
+
 
 def setup_logging(
     default_path='logging.json',
     default_level=logging.INFO,
-    env_key='LOG_CFG'
+    env_key='LOG_CFG',
+    queued=False
 ):
-    """Setup logging configuration"""
+    """Setup logging configuration once per process
+
+    With queued the handlers write on a background thread."""
+    global _logging_configured
+    if _logging_configured:
+        if queued:
+            queuedlogging.startQueuedLogging()
+        return
+    _logging_configured = True
+
     path = default_path
     value = os.getenv(env_key, None)
     if value:
@@ -27,6 +61,8 @@ def setup_logging(
         logging.config.dictConfig(config)
     else:
         logging.basicConfig(level=default_level)
+    if queued:
+        queuedlogging.startQueuedLogging()
 
 
 def getDialect(filename):
@@ -48,34 +84,72 @@ def parseInt(s):
         return s
 
 
+def csv_reader(filename, dialect=None, **kwargs):
+    """Yield the undecoded rows of a file, sniffing the dialect in the same
+    open."""
+    if os.path.isfile(filename):
+        with open(filename, 'rb') as f:
+            if dialect is None:
+                dialect = csv.Sniffer().sniff(f.read(1024))
+                logging.info("using %s for %s", dialect, filename)
+                f.seek(0)
+            for row in csv.reader(f, dialect=dialect, **kwargs):
+                yield row
+    else:
+        logging.error("Filename %s does not exist", filename)
+
+
 def unicode_csv_reader(filename, dialect=None, **kwargs):
     """Yield the rows of a file """
-    if os.path.isfile(filename):
+    for row in csv_reader(filename, dialect, **kwargs):
+        yield [unicode(cell, 'utf-8') for cell in row]
 
-        if dialect is None:
-            dialect = getDialect(filename)
 
-        with open(filename, 'rb') as f:
-            csv_reader = csv.reader(f, dialect=dialect, **kwargs)
-            for row in csv_reader:
-                yield [unicode(cell, 'utf-8') for cell in row]
+def parseParticipantRow(row):
+    """Decode the text cells and parse the points of a registration row"""
+    name = unicode(row[1], 'utf-8')
+    if "GuSp" in row[2]:
+        stufe = "GuSp"
+        trupp = unicode(row[3], 'utf-8')
     else:
-        logging.error("Filename %s does not exist", filename)
+        stufe = "CaEx"
+        trupp = unicode(row[4], 'utf-8')
+    return name, stufe, trupp, [parseInt(c) for c in row[5:]]
 
 
 class WorkshopDivision(object):
     """A class to divise children to workshops"""
 
-    def __init__(self):
-        """Initialize the workshop division"""
+    def __init__(self, configure_logging=True, queued_logging=False):
+        """Initialize the workshop division
+
+        With queued_logging the log handlers write on a background thread,
+        see queuedlogging."""
         super(WorkshopDivision, self).__init__()
         # init the sets
         self.workshops = []
+        self.workshop_index = {}
         self.participants = []
         self.available_dates = ["Sa", "Mi"]
         self.available_ages = ["GuSp", "CaEx"]
+        # the numpy backend for the statistics is built on demand
+        self.use_matrix = False
+        self.matrix = None
+        # the memory mapped points of a loaded snapshot by participant
+        self.snapshot_points = None
+        # the sparse backend for registrations with few points
+        self.use_sparse = False
+        self.sparse = None
+        # the live statistics follow the workshops once they are used
+        self.statistics = None
+        self.instrumentation = None
+        self.fallback_policy = "emptiest"
+        # the csv files the instance was loaded from
+        self.sources = []
+        self.run_log = None
         # load the logging configuration
-        setup_logging()
+        if configure_logging:
+            setup_logging(queued=queued_logging)
         logger.debug("Workshop Division created")
 
     def addWorkshop(self, name, chef, str_ages,
@@ -97,14 +171,284 @@ class WorkshopDivision(object):
             logger.error("No Dates!")
 
         w = Workshop(name, chef, ages, dates,
-                     parseInt(max_participants_per_date))
+                     parseInt(max_participants_per_date),
+                     len(self.workshops))
         self.workshops.append(w)
+        self.workshop_index.setdefault(name, w)
+        self.clearPreferences()
+        self.snapshot_points = None
+        self.clearStatistics()
 
     def addParticipant(self, name, stufe, trupp, points):
         """Adds a new participants to the diviser"""
         logger.debug("add Participant %s", name)
         p = Participant(name, stufe, trupp, points, self.available_dates)
         self.participants.append(p)
+        self.clearPreferences()
+        # the snapshot has no row of the new participant
+        self.snapshot_points = None
+        if self.statistics is not None:
+            self.statistics.addParticipant(p)
+        return p
+
+    def useMatrixBackend(self, enable=True):
+        """Compute the statistics per workshop with a numpy matrix.
+
+        Returns False if numpy is not installed, then the statistics keep
+        using the plain python implementation."""
+        if enable and not preferencematrix.isSupported():
+            logger.warning("numpy is not installed, can't use the matrix")
+            enable = False
+        self.use_matrix = enable
+        self.matrix = None
+        return enable
+
+    def useSparseBackend(self, enable=True):
+        """Compute the statistics per workshop and the participants with the
+        most points only from the non-zero points.
+
+        The work grows with the given points instead of participants x
+        workshops, so it pays off when most participants only give points
+        to a few of many workshops. The matrix backend goes first."""
+        self.use_sparse = enable
+        self.sparse = None
+        return enable
+
+    def useFallbackPolicy(self, policy):
+        """Set how the fallback places the remaining participants.
+
+        "emptiest" puts them into the emptiest workshops, "fair" places the
+        least satisfied participants first into the workshops they give the
+        most points. Returns False for an unknown policy."""
+        if policy not in fallbackdivision.POLICIES:
+            logger.error("Unknown fallback policy %s", policy)
+            return False
+        self.fallback_policy = policy
+        return True
+
+    def clearPreferences(self):
+        """Forget the matrix and the sparse preferences, they depend on the
+        participants and their order and are built again on demand"""
+        self.matrix = None
+        self.sparse = None
+
+    def getPreferenceMatrix(self):
+        """Get the preference matrix or None if the backend is not used.
+
+        After loadSnapshot the points are taken from the memory map of the
+        snapshot instead of the participants."""
+        if self.use_matrix and self.matrix is None:
+            points = None
+            if self.snapshot_points is not None:
+                matrix, rows = self.snapshot_points
+                points = matrix[[rows[p] for p in self.participants]]
+            self.matrix = preferencematrix.PreferenceMatrix(
+                self.workshops, self.participants, self.available_dates,
+                points)
+        return self.matrix
+
+    def getSparsePreferences(self):
+        """Get the sparse preferences or None if the backend is not used"""
+        if self.use_sparse and self.sparse is None:
+            self.sparse = sparsepreferences.SparsePreferences(
+                self.workshops, self.participants)
+        return self.sparse
+
+    def getStatistics(self):
+        """Get the live statistics of the division, see DivisionStatistics.
+
+        They are created on the first use and then updated on every
+        assignment, so reading them is cheap even during a division."""
+        if self.statistics is None:
+            self.statistics = DivisionStatistics(self.workshops,
+                                                 self.participants)
+        return self.statistics
+
+    def clearStatistics(self):
+        """Stop the live statistics, they are created again on demand"""
+        if self.statistics is not None:
+            self.statistics.close()
+            self.statistics = None
+
+    def getSortedParticipants(self):
+        """Get the participants in an order independent of the shuffle"""
+        def key(p):
+            return (p.name, p.age, p.trupp,
+                    [p.getPoints(w) for w in self.workshops])
+        return sorted(self.participants, key=key)
+
+    def getInstanceData(self):
+        """Get the workshops and participants as plain tuples.
+
+        The participants are in the order of getSortedParticipants."""
+        workshops = [(w.name, w.supervisor, w.ages, w.days,
+                      w.max_participants_per_day) for w in self.workshops]
+        participants = [(p.name, p.age, p.trupp,
+                         [p.getPoints(w) for w in self.workshops])
+                        for p in self.getSortedParticipants()]
+        return (self.available_dates, self.available_ages, workshops,
+                participants)
+
+    def loadInstanceData(self, data):
+        """Create the workshops and participants of getInstanceData"""
+        dates, ages, workshops, participants = data
+        self.available_dates = list(dates)
+        self.available_ages = list(ages)
+        self.workshops = [Workshop(*w, id=i) for i, w in enumerate(workshops)]
+        self.snapshot_points = None
+        self.workshop_index = {}
+        for w in self.workshops:
+            self.workshop_index.setdefault(w.name, w)
+        self.participants = []
+        for name, age, trupp, points in participants:
+            # the points are already normalized and in the workshop order
+            self.participants.append(Participant(name, age, trupp, points,
+                                                 self.available_dates,
+                                                 normalize=False))
+        self.clearPreferences()
+        self.clearStatistics()
+
+    def getAssignmentData(self, reference):
+        """Get the order of the participants and the participants of every
+        workshop and day as indices into the reference list."""
+        index = {p: i for i, p in enumerate(reference)}
+        order = [index[p] for p in self.participants]
+        rosters = [[[index[p] for p in w.participants[d]] for d in w.days]
+                   for w in self.workshops]
+        return order, rosters
+
+    def loadAssignmentData(self, data, reference):
+        """Replace the current assignment with one of getAssignmentData"""
+        order, rosters = data
+        for p in self.participants:
+            p.clearAssignment()
+        self.participants = [reference[i] for i in order]
+        self.clearPreferences()
+        for w, days in zip(self.workshops, rosters):
+            for d, indices in zip(w.days, days):
+                for i in indices:
+                    reference[i].assignWorkshop(w, d)
+
+    def saveSnapshot(self, filename, assignment=True):
+        """Save the instance and the current assignment as a snapshot.
+
+        The snapshot remembers the content hashes of the loaded csv files,
+        so loadSnapshot can tell when it is outdated."""
+        reference = self.getSortedParticipants()
+        data = self.getAssignmentData(reference) if assignment else None
+        snapshot.writeSnapshot(filename, self.getInstanceData(), data,
+                               snapshot.hashFiles(self.sources))
+        logger.info("Saved snapshot of %d participants to %s",
+                    len(self.participants), filename)
+
+    def loadSnapshot(self, filename, sources=None):
+        """Load the instance and the assignment of a snapshot.
+
+        If the sources are given, the snapshot is only loaded if it was
+        saved from csv files with the same content. Returns if the snapshot
+        was loaded."""
+        result = snapshot.readSnapshot(filename)
+        if result is None:
+            return False
+        hashes, data, assignment, matrix = result
+        if sources is not None and hashes != snapshot.hashFiles(sources):
+            logger.info("Snapshot %s is outdated", filename)
+            return False
+
+        self.loadInstanceData(data)
+        if matrix is not None:
+            self.snapshot_points = (matrix, {p: i for i, p in
+                                             enumerate(self.participants)})
+        self.sources = list(sources) if sources is not None else []
+        if assignment is not None:
+            self.loadAssignmentData(assignment, self.participants[:])
+        logger.info("Loaded snapshot of %d participants from %s",
+                    len(self.participants), filename)
+        return True
+
+    def loadCached(self, workshop_csv, participant_csv, snapshot_file,
+                   dialect=None):
+        """Loads the workshops and participants from the snapshot file if
+        it matches the csv files, else from the csv files and saves a new
+        snapshot. Returns if the snapshot was used."""
+        sources = [workshop_csv, participant_csv]
+        if os.path.isfile(snapshot_file) and \
+                self.loadSnapshot(snapshot_file, sources):
+            # shuffle participants for randomness like loadParticipants
+            shuffle(self.participants)
+            self.clearPreferences()
+            return True
+        self.loadWorkshops(workshop_csv, dialect)
+        self.loadParticipants(participant_csv, dialect)
+        self.saveSnapshot(snapshot_file, assignment=False)
+        return False
+
+    def getAssignmentArray(self):
+        """Get the current assignment as a participant x day numpy array of
+        workshop ids for scoreAssignments or None without numpy"""
+        if not scoring.isSupported():
+            logger.error("numpy is not installed, can't build the array")
+            return None
+        return scoring.getAssignmentArray(self.participants,
+                                          self.available_dates)
+
+    def scoreAssignments(self, assignments=None):
+        """Score a batch of assignment arrays of the participants.
+
+        The arrays are participant x day workshop ids like the one of
+        getAssignmentArray, the current assignment by default. Returns the
+        scores of scoring.BatchScorer or None without numpy."""
+        if not scoring.isSupported():
+            logger.error("numpy is not installed, can't score assignments")
+            return None
+        if assignments is None:
+            assignments = self.getAssignmentArray()
+        scorer = scoring.BatchScorer(self.workshops, self.participants,
+                                     self.available_dates)
+        return scorer.score(assignments)
+
+    def startRunLog(self, filename, level=logging.INFO):
+        """Write the log records from now on also to filename"""
+        self.stopRunLog()
+        self.run_log = queuedlogging.startRunLog(filename, level)
+
+    def stopRunLog(self):
+        """Write the queued log records and close the run log"""
+        queuedlogging.flushQueuedLogging()
+        if self.run_log is not None:
+            queuedlogging.stopRunLog(self.run_log)
+            self.run_log = None
+
+    def startInstrumentation(self, profile_file=None):
+        """Start counting the hot calls and timing the phases of the run.
+
+        The calls of isAvailable, hasFreeSlots, getPoints, getWorkshop and
+        assignWorkshop are counted and normalizePoints is timed. If
+        profile_file is given, the run is profiled with cProfile and the
+        stats are dumped to that file when the instrumentation stops."""
+        if self.instrumentation is not None:
+            self.stopInstrumentation()
+        self.instrumentation = Instrumentation(
+            [(Participant, "isAvailable", "isAvailable"),
+             (Workshop, "hasFreeSlots", "hasFreeSlots"),
+             (Participant, "getPoints", "getPoints"),
+             (WorkshopDivision, "getWorkshop", "getWorkshop"),
+             (Participant, "assignWorkshop", "assignWorkshop")],
+            [(Participant, "normalizePoints", "normalize")],
+            profile_file)
+        self.instrumentation.start()
+
+    def stopInstrumentation(self):
+        """Stop the instrumentation, log and return its summary.
+
+        The summary has the seconds per phase, the number of calls and the
+        seconds and assignments of every greedy iteration."""
+        if self.instrumentation is None:
+            return None
+        self.instrumentation.stop()
+        summary = self.instrumentation.logSummary()
+        self.instrumentation = None
+        return summary
 
     def getNumWorkshops(self):
         """Get the number of workshops in the diviser"""
@@ -112,33 +456,42 @@ class WorkshopDivision(object):
 
     def getWorkshop(self, name):
         """Get the workshop with the specified name"""
-        for w in self.workshops:
-            if w.name == name:
-                logger.debug("Found Workshop %s", name)
-                return w
+        w = self.workshop_index.get(name)
+        if w is not None:
+            logger.debug("Found Workshop %s", name)
+            return w
 
         logger.warning("Did not found Workshop %s", name)
 
     def getAllWorkshopPlaces(self):
-        """"""
-        return sum([w.maxParticipants() for w in self.workshops])
+        """Get the places of all workshops on all their days"""
+        return self.getStatistics().total_places
 
     def getWorkshopStatistics(self):
-        """"""
+        """Get the number of workshops, their places and the share of the
+        places that is assigned"""
+        statistics = self.getStatistics()
         data = {}
         data['anzahl'] = self.getNumWorkshops()
-        data['platz'] = self.getAllWorkshopPlaces()
-        logging.info("Workshop Statistics: %s", str(data))
+        data['platz'] = statistics.total_places
+        data['belegt'] = statistics.getSummary()['fill']
+        logging.info("Workshop Statistics: %s", data)
         return data
 
     def getNumParticipants(self):
         """Get the number of participants in the diviser"""
-        return len(self.workshops)
+        return len(self.participants)
 
     def getSumPointsPerWorkshop(self, remaining=None):
         """Get all points per workshop"""
         if remaining is None:
             remaining = self.participants
+        matrix = self.getPreferenceMatrix()
+        if matrix is not None:
+            return matrix.getSumPoints(remaining)
+        sparse = self.getSparsePreferences()
+        if sparse is not None:
+            return sparse.getSumPoints(remaining)
         all_points = {w: 0.0 for w in self.workshops}
         for p in remaining:
             for w in self.workshops:
@@ -150,6 +503,12 @@ class WorkshopDivision(object):
     def getMaxPointsPerWorkshops(self, remaining=None):
         if remaining is None:
             remaining = self.participants
+        matrix = self.getPreferenceMatrix()
+        if matrix is not None:
+            return matrix.getMaxPoints(remaining)
+        sparse = self.getSparsePreferences()
+        if sparse is not None:
+            return sparse.getMaxPoints(remaining)
 
         all_points = {w: 0.0 for w in self.workshops}
 
@@ -164,6 +523,12 @@ class WorkshopDivision(object):
         """Get all points per workshop"""
         if remaining is None:
             remaining = self.participants
+        matrix = self.getPreferenceMatrix()
+        if matrix is not None:
+            return matrix.getMedianPoints(remaining)
+        sparse = self.getSparsePreferences()
+        if sparse is not None:
+            return sparse.getMedianPoints(remaining)
         all_points = {w: [] for w in self.workshops}
         for p in remaining:
             for w in self.workshops:
@@ -183,6 +548,12 @@ class WorkshopDivision(object):
         """Get all points per workshop"""
         if remaining is None:
             remaining = self.participants
+        matrix = self.getPreferenceMatrix()
+        if matrix is not None:
+            return matrix.getMeanPoints(remaining)
+        sparse = self.getSparsePreferences()
+        if sparse is not None:
+            return sparse.getMeanPoints(remaining)
         all_points = {w: [] for w in self.workshops}
         for p in remaining:
             for w in self.workshops:
@@ -199,16 +570,31 @@ class WorkshopDivision(object):
         return mean_points
 
     def getParticipantsStatistics(self):
-        """"""
+        """Get the number of participants, the fully assigned ones, their
+        points, the mean points per workshop of getMeanPointsPerWorkshop
+        and the mean points of the participants per workshop that gave it
+        points and still could take it, all from the live statistics"""
+        statistics = self.getStatistics()
+        summary = statistics.getSummary()
+        mean_points = {}
+        for w in self.workshops:
+            demand, points = statistics.getDemand(w)
+            if demand:
+                mean_points[w] = points / demand
         data = {}
         data['anzahl'] = self.getNumParticipants()
-        data['platz'] = self.getMeanPointsPerWorkshop()
-        logging.info("Workshop Statistics: %s", str(data))
+        data['zugeteilt'] = summary['fully_assigned']
+        data['punkte'] = summary['points']
+        data['platz'] = statistics.getMeanAvailablePoints()
+        data['nachfrage'] = mean_points
+        logging.info("Participant Statistics: %s", data)
         return data
 
+    @timedPhase("loadWorkshops")
     def loadWorkshops(self, csv_file, dialect=None):
         """Loads the workshops from a csv file"""
         logger.info('loading workshops from %s', csv_file)
+        self.sources.append(csv_file)
         reader = unicode_csv_reader(csv_file, dialect)
 
         # skip headers
@@ -222,45 +608,57 @@ class WorkshopDivision(object):
             dates = row[5]
             self.addWorkshop(name, chef, ages, max_participants, dates)
 
+    @timedPhase("loadParticipants")
     def loadParticipants(self, csv_file, dialect=None):
-        """Loads the participants from a csv file"""
+        """Loads the participants from a csv file
+
+        The workshop columns are resolved once from the header and the
+        rows are streamed into the participants."""
         logger.info('loading participants from %s', csv_file)
-        reader = unicode_csv_reader(csv_file, dialect)
+        self.sources.append(csv_file)
+        reader = csv_reader(csv_file, dialect)
 
         # get headers
-        header = next(reader)
-        name_ids = range(5, len(header))
-        w_names = [header[i] for i in name_ids]
+        header = [unicode(cell, 'utf-8') for cell in next(reader)]
+        workshops = [self.getWorkshop(name) for name in header[5:]]
 
         for row in reader:
-            name = row[1]
-            if "GuSp" in row[2]:
-                stufe = "GuSp"
-            else:
-                stufe = "CaEx"
-            trupp = row[3] if stufe is "GuSp" else row[4]
-            points = {}
-            for count, i in enumerate(name_ids):
-                w = self.getWorkshop(w_names[count])
-                points[w] = parseInt(row[i])
-            self.addParticipant(name, stufe, trupp, points)
+            name, stufe, trupp, points = parseParticipantRow(row)
+            # the points of the workshops by their ids
+            row = [0] * len(self.workshops)
+            for w, p in zip(workshops, points):
+                if w is not None:
+                    row[w.id] = p
+            self.addParticipant(name, stufe, trupp, row)
 
         # shuffle participants for randomness
         shuffle(self.participants)
+        self.clearPreferences()
 
     def getParticipantWithMaxPoints(self, w, remaining=None):
-        """Get the participants with the maximum number of given points"""
-        if remaining is None:
-            remaining = self.participants
-        # points are not allowed to be zero!
-        max_points = 0.01
-        max_points_p = None
-        for p in remaining:
-            if p.isAvailable(w):
-                points = p.getPoints(w)
-                if points > max_points:
-                    max_points_p = p
-                    max_points = points
+        """Get the participants with the maximum number of given points.
+
+        With the sparse backend remaining should be a set, other sequences
+        are copied into one."""
+        sparse = self.getSparsePreferences()
+        if sparse is not None:
+            if remaining is not None and \
+                    not isinstance(remaining, (set, frozenset)):
+                remaining = set(remaining)
+            max_points_p, max_points = sparse.getParticipantWithMaxPoints(
+                w, remaining)
+        else:
+            if remaining is None:
+                remaining = self.participants
+            # points are not allowed to be zero!
+            max_points = 0.01
+            max_points_p = None
+            for p in remaining:
+                if p.isAvailable(w):
+                    points = p.getPoints(w)
+                    if points > max_points:
+                        max_points_p = p
+                        max_points = points
 
         if max_points_p:
             logger.info('%s has a maximum of %.1f points for %s',
@@ -272,19 +670,20 @@ class WorkshopDivision(object):
 
     def sortWorkshopsBySinglePart(self, remaining):
         points = self.getMaxPointsPerWorkshops(remaining)
-        sorted_workshops = sorted(points, key=points.get, reverse=True)
+        sorted_workshops = sorted(points, key=lambda w: (-points[w], w.id))
         return sorted_workshops
 
     def sortWorkshopsByMaxPoints(self, remaining):
         points = self.getSumPointsPerWorkshop(remaining)
-        sorted_workshops = sorted(points, key=points.get, reverse=True)
-        logger.debug('Sorted workshops by their maximum points. %s',
-                     str(points))
+        # ties go to the lower id, the dict order depends on the addresses
+        sorted_workshops = sorted(points, key=lambda w: (-points[w], w.id))
+        logger.debug('Sorted workshops by their maximum points. %s', points)
         return sorted_workshops
 
     def sortWorkshopsByMinParticipants(self):
         num_part = {w: w.getNumParticipants() for w in self.workshops}
-        sorted_workshops = sorted(num_part, key=num_part.get, reverse=False)
+        sorted_workshops = sorted(num_part,
+                                  key=lambda w: (num_part[w], w.id))
         return sorted_workshops
 
     def calculateRemainingParticipants(self, remaining):
@@ -296,76 +695,317 @@ class WorkshopDivision(object):
 
         return remaining
 
-    def startDivision(self):
-        """Start the division of the participants to the workshops"""
+    def greedyDivision(self):
+        """Assign the participants greedily by rescanning after every step.
+
+        Returns the participants that are not fully assigned."""
         remaining_part = self.participants[:]
         change = True
         while len(remaining_part) > 0 and change:
+            if self.instrumentation is not None:
+                self.instrumentation.startIteration()
             # reduce the number of remaining
             self.calculateRemainingParticipants(remaining_part)
             sorted_workshops = self.sortWorkshopsByMaxPoints(remaining_part)
+            # the sparse backend only looks the remaining up, so the set is
+            # built once for all workshops
+            candidates = remaining_part
+            if self.getSparsePreferences() is not None:
+                candidates = set(remaining_part)
             change = False
             for w in sorted_workshops:
-                participant = self.getParticipantWithMaxPoints(w,
-                                                               remaining_part)
+                participant = self.getParticipantWithMaxPoints(w, candidates)
                 if participant is not None and participant.isAvailable(w):
                     participant.assignWorkshop(w)
                     change = True
                     break
+            if self.instrumentation is not None:
+                self.instrumentation.endIteration()
 
+        return remaining_part
+
+    @timedPhase("fallback")
+    def assignRemainingParticipants(self, remaining_part):
+        """Put the remaining participants into any workshop they can take
+        with the fallback policy. Returns the participants that are still
+        not fully assigned."""
         if len(remaining_part) > 0:
             logger.warning("Not all participants got a workshop! (%d)",
                            len(remaining_part))
+            division = fallbackdivision.FallbackDivision(
+                self.workshops, self.fallback_policy)
+            remaining_part = division.run(remaining_part)
+        return remaining_part
+
+    @timedPhase("division")
+    def startDivision(self, engine="greedy", fallback=True):
+        """Start the division of the participants to the workshops
+
+        engine is either "greedy", which rescans all participants after every
+        assignment, "incremental", which makes the same assignments with
+        candidate heaps and running point sums per workshop, or "flow",
+        a heuristic that picks the workshops with a min-cost flow, schedules
+        their days afterwards and fills the days it left free with the
+        incremental engine, see FlowDivision. Without fallback the remaining
+        participants are not put into the emptiest workshops."""
+        if engine == "greedy":
+            remaining_part = self.greedyDivision()
+        elif engine == "incremental":
+            division = IncrementalDivision(self.workshops, self.participants)
+            remaining_part = division.run()
+        elif engine == "flow":
+            FlowDivision(self.workshops, self.participants,
+                         matrix=self.getPreferenceMatrix()).run()
+            division = IncrementalDivision(self.workshops, self.participants)
+            remaining_part = division.run()
+        else:
+            logger.error("Unknown division engine %s", engine)
+            return
+
+        if fallback:
+            self.assignRemainingParticipants(remaining_part)
+
+    def getInputSeed(self):
+        """Get a seed from the content of the loaded csv files, so equal
+        files are always shuffled the same"""
+        key = resultcache.getKey(snapshot.hashFiles(self.sources))
+        return int(key[:8], 16)
+
+    def startSeededDivision(self, engine="greedy", seed=0):
+        """Divide with the participants shuffled by seed instead of the
+        random shuffle of loadParticipants"""
+        reference = self.getSortedParticipants()
+        self.participants = reference[:]
+        Random(seed).shuffle(self.participants)
+        self.clearPreferences()
+        self.startDivision(engine)
+        return reference
+
+    def startCachedDivision(self, engine="greedy", seed=None,
+                            cache_dir=".division_cache",
+                            max_bytes=64 * 1024 * 1024):
+        """Restore the result of an earlier equal division or divide and
+        remember the result.
+
+        The key is the content of the loaded csv files, the dates, the ages,
+        the engine, the backends, the fallback policy and the seed. The
+        participants are shuffled with the seed before the division like in
+        startSeededDivision. Without a seed the result depends on the
+        shuffle of loadParticipants, so it is neither cached nor restored,
+        see getInputSeed. The cache keeps at most max_bytes of results and
+        drops the least recently used. Returns if the result was restored
+        from the cache."""
+        if not self.sources:
+            logger.error("Can't cache a division without loaded csv files")
+            self.startDivision(engine)
+            return False
+        if seed is None:
+            logger.info("Not caching the division without a seed")
+            self.startDivision(engine)
+            return False
+
+        key = resultcache.getKey(snapshot.hashFiles(self.sources),
+                                 self.available_dates, self.available_ages,
+                                 engine, self.use_matrix, self.use_sparse,
+                                 self.fallback_policy, seed)
+        cache = resultcache.ResultCache(cache_dir, max_bytes)
+        reference = self.getSortedParticipants()
+        data = cache.get(key)
+        if data is not None and len(data[0]) == len(reference):
+            self.loadAssignmentData(data, reference)
+            logger.warning("Restored the division from the cache (%s)", key)
+            return True
+
+        reference = self.startSeededDivision(engine, seed)
+        cache.put(key, self.getAssignmentData(reference))
+        return False
+
+    @timedPhase("division")
+    def startShardedDivision(self, engine="incremental", processes=None,
+                             split=True):
+        """Divide the independent age groups separately and merge them.
+
+        The ages and workshops are split into the connected components of
+        the compatibility graph. With split, ages that share workshops are
+        divided separately too and the shared capacity is split by the
+        points of the ages. The shards are divided in parallel processes if
+        there are several. Places left free by the split are filled with
+        the incremental engine afterwards, then the fallback runs."""
+        sharding.startShardedDivision(self, engine, processes, split)
+        division = IncrementalDivision(self.workshops, self.participants)
+        self.assignRemainingParticipants(division.run())
+
+    @timedPhase("loadAssignment")
+    def loadAssignment(self, csv_file, dialect=None):
+        """Loads a previous division from an exportTrupps csv file
+
+        The rows are matched to the participants by name, stufe and trupp.
+        Rows of participants that are not registered anymore are skipped,
+        as are rows whose workshop is full or gone. Returns the number of
+        assigned workshop-days."""
+        logger.info('loading assignment from %s', csv_file)
+        reader = unicode_csv_reader(csv_file, dialect)
 
-            for p in remaining_part:
-                sorted_workshops = self.sortWorkshopsByMinParticipants()
-                for workshop in sorted_workshops:
-                    if p.isAvailable(workshop):
-                        day = p.assignWorkshop(workshop)
-                        print(str(p) + " - " + day + " - " + str(workshop))
-                        break
-
-                # p.clearAssignment()
-            # self.startDivision()
+        # skip headers
+        next(reader)
 
+        participants = {(p.name, p.age, p.trupp): p
+                        for p in self.participants}
+        assigned = 0
+        for row in reader:
+            p = participants.get((row[2], row[0], row[1]))
+            if p is None:
+                logger.info("%s is not registered anymore", row[2])
+                continue
+            w = self.getWorkshop(row[4])
+            day = row[3]
+            if w is None or day not in p.workshops or \
+                    p.workshops[day] is not None or not w.usesDay(day) or \
+                    not w.hasFreeSlots(day) or not p.isAvailable(w):
+                logger.warning("Can't keep %s for %s on %s", p, row[4], day)
+                continue
+            p.assignWorkshop(w, day)
+            assigned += 1
+        return assigned
+
+    def removeParticipants(self, participants):
+        """Remove the participants and free their workshops"""
+        removed = set(participants)
+        for p in removed:
+            p.clearAssignment()
+            for w in self.workshops:
+                w.unsubscribe(p)
+            if self.statistics is not None:
+                self.statistics.removeParticipant(p)
+        self.participants = [p for p in self.participants
+                             if p not in removed]
+        self.clearPreferences()
+
+    @timedPhase("division")
+    def updateDivision(self, removed=(), max_repairs=100, fallback=True):
+        """Update the current division for late registrations and
+        cancellations.
+
+        The removed participants are dropped first. Then the participants
+        that are not fully assigned, usually the newcomers added after the
+        division, get the free slots. If one of them still has a free day,
+        a settled participant of a full workshop may be moved to another
+        workshop on the same day if that gains points, at most max_repairs
+        times. Returns the
+        participants that are not fully assigned before the fallback."""
+        if removed:
+            self.removeParticipants(removed)
+        pending = [p for p in self.participants if not p.isFullyAssigned()]
+        remaining_part = Redivision(self.workshops, pending).run(max_repairs)
+        if fallback:
+            self.assignRemainingParticipants(remaining_part)
+        return remaining_part
+
+    def improveDivision(self, time_limit=1.0, max_iterations=None, seed=0):
+        """Improve the current division with moves and swaps of single
+        workshop-days that increase the total points.
+
+        Stops after time_limit seconds or max_iterations candidates and
+        returns a report of the gained points."""
+        search = LocalSearch(self.workshops, self.participants, seed)
+        return search.run(time_limit, max_iterations)
+
+    def startAnytimeDivision(self, time_limit=10.0, progress=None,
+                             engine="incremental", seed=0,
+                             progress_interval=0.5):
+        """Divide within time_limit seconds and improve until then.
+
+        A complete division is made with startDivision first, then the
+        local search of improveDivision keeps improving it until the time
+        is up. The local search only applies improvements, so the current
+        division is always the best so far.
+
+        progress is called with a status dict of the phase, the seconds,
+        the total points and the number of participants that are not fully
+        assigned. It is called after the division, about every
+        progress_interval seconds while improving and at the end. Returns
+        the last status."""
+        start = time.time()
+
+        def report(phase, points=None):
+            # the local search passes its running points
+            if points is None:
+                score = multistart.scoreDivision(self.participants)
+                points, unassigned = score['points'], score['unassigned']
+            else:
+                unassigned = len([p for p in self.participants
+                                  if not p.isFullyAssigned()])
+            status = {'phase': phase, 'seconds': time.time() - start,
+                      'points': points, 'unassigned': unassigned}
+            if progress is not None:
+                progress(status)
+            return status
+
+        self.startDivision(engine)
+        report("division")
+        remaining = time_limit - (time.time() - start)
+        if remaining > 0:
+            search = LocalSearch(self.workshops, self.participants, seed)
+            search.run(remaining,
+                       progress=lambda points: report("improve", points),
+                       progress_interval=progress_interval)
+        status = report("done")
+        logger.warning("Anytime division finished after %.1fs with %.1f "
+                       "points, %d unassigned", status['seconds'],
+                       status['points'], status['unassigned'])
+        return status
+
+    def startMultiDivision(self, runs=8, seed=0, engine="incremental",
+                           processes=None):
+        """Run divisions with differently shuffled participants in parallel
+        and keep the best one.
+
+        Run i shuffles the participants with seed + i. The runs are ranked
+        by the number of participants that are not fully assigned, then
+        by the total points and then by the minimum points of a single
+        participant. Returns the seed and the score of the kept run."""
+        return multistart.startMultiDivision(self, runs, seed, engine,
+                                             processes)
+
+    def startSweep(self, scenarios, engine="incremental", seed=0,
+                   processes=None):
+        """Divide modified copies of the workshops in parallel, see whatif.
+
+        scenarios is a list of (label, modifications), every scenario is
+        divided with the participants shuffled by seed. The division itself
+        is not changed. Returns a list of (label, score) starting with the
+        unmodified workshops or None if a scenario is invalid."""
+        return whatif.startSweep(self, scenarios, engine, seed, processes)
+
+    @timedPhase("export")
+    def exportAll(self, prefix="export", views=("days", "workshops",
+                                                "trupps", "rosters"),
+                  formats=("csv",)):
+        """Export the views of the division in one pass
+
+        The views are "days", "workshops", "trupps" and "rosters" (one row
+        per workshop and day), the formats "csv", "jsonl" and "parquet"
+        (needs pyarrow). Every file is named prefix_view.extension.
+        Returns the names of the written files."""
+        views_exporter = exporter.Exporter(self)
+        written = []
+        for view in views:
+            for output_format in formats:
+                extension = exporter.EXTENSIONS.get(output_format,
+                                                    output_format)
+                filename = "%s_%s.%s" % (prefix, view, extension)
+                if views_exporter.write(filename, view, output_format):
+                    written.append(filename)
+        return written
+
+    @timedPhase("exportDays")
     def exportDays(self, filename):
-        with open(filename, 'wb') as f:
-            csv_writer = csv.writer(f)
-            header = ["day", "workshop", "name", "stufe", "trupp", "punkte"]
-            csv_writer.writerow(header)
-            for d in self.available_dates:
-                for w in self.workshops:
-                    if w.usesDay(d):
-                        participants = w.getParticipantsOfDay(d)
-                        for p in participants:
-                            row = [d, w.name, p.name, p.age, p.trupp,
-                                   str(p.getPoints(w))]
-                            row = [r.encode('utf-8') for r in row]
-                            csv_writer.writerow(row)
+        exporter.Exporter(self).write(filename, "days")
 
+    @timedPhase("exportWorkshops")
     def exportWorkshops(self, filename):
-        with open(filename, 'wb') as f:
-            csv_writer = csv.writer(f)
-            header = ["workshop", "day", "name", "stufe", "trupp", "punkte"]
-            csv_writer.writerow(header)
-            for w in self.workshops:
-                for d in w.days:
-                    participants = w.getParticipantsOfDay(d)
-                    for p in participants:
-                        row = [w.name, d, p.name, p.age, p.trupp,
-                               str(p.getPoints(w))]
-                        row = [r.encode('utf-8') for r in row]
-                        csv_writer.writerow(row)
+        exporter.Exporter(self).write(filename, "workshops")
 
+    @timedPhase("exportTrupps")
     def exportTrupps(self, filename):
-        with open(filename, 'wb') as f:
-            csv_writer = csv.writer(f)
-            header = ["stufe", "trupp", "name", "day", "workshop", "punkte"]
-            csv_writer.writerow(header)
-            for p in self.participants:
-                for d, w in p.workshops.iteritems():
-                    if w is not None:
-                        row = [p.age, p.trupp, p.name,
-                               d, w.name, str(p.getPoints(w))]
-                        row = [r.encode('utf-8') for r in row]
-                        csv_writer.writerow(row)
+        exporter.Exporter(self).write(filename, "trupps")